@@ -1,175 +1,590 @@
 import streamlit as st
-import sqlite3
 import bcrypt
 import pandas as pd
 import uuid
-from datetime import datetime, timedelta
+import hashlib
+import secrets
+from datetime import datetime
 import logging
-from functools import lru_cache
 import threading
-from contextlib import contextmanager
+import time
+import os
+import sys
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from db import (get_read_pool, get_db_connection, read_snapshot, transaction, get_change_bus, get_write_queue,
+                submit_write, submit_transaction)
 
 # Set up logging to capture errors
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Thread-local storage for database connections
-thread_local = threading.local()
+# Explicit id lists are bound in fixed-size chunks to stay under SQLite's variable limit
+SQL_IN_CHUNK_SIZE = 500
+REFDATA_CHECK_INTERVAL = float(os.environ.get('ORDERS_REFDATA_CHECK_INTERVAL', '5'))
+# Read progress from the orders.progress column maintained on write, not from services
+DASHBOARD_PERSISTED_PROGRESS = os.environ.get('ORDERS_DASHBOARD_PERSISTED_PROGRESS', '1') == '1'
+ORDERS_PAGE_SIZE = int(os.environ.get('ORDERS_PAGE_SIZE', '500'))
+DASHBOARD_TTL = float(os.environ.get('ORDERS_DASHBOARD_TTL', '300'))
+DASHBOARD_FEED_POLL_INTERVAL = float(os.environ.get('ORDERS_DASHBOARD_FEED_POLL_INTERVAL', '2'))
+# Password verification: bcrypt runs on a few worker threads with a bounded backlog,
+# and repeated failures for one username are throttled
+AUTH_WORKERS = int(os.environ.get('ORDERS_AUTH_WORKERS', '2'))
+AUTH_MAX_PENDING = int(os.environ.get('ORDERS_AUTH_MAX_PENDING', '16'))
+AUTH_TIMEOUT = float(os.environ.get('ORDERS_AUTH_TIMEOUT', '10'))
+AUTH_THROTTLE_WINDOW = float(os.environ.get('ORDERS_AUTH_THROTTLE_WINDOW', '300'))
+AUTH_MAX_FAILURES_PER_USER = int(os.environ.get('ORDERS_AUTH_MAX_FAILURES_PER_USER', '5'))
+# bcrypt cost: calibrated at startup to the slowest cost within the target verification
+# time, clamped to [min, max] rounds; ORDERS_AUTH_HASH_ROUNDS pins it instead
+AUTH_HASH_TARGET_MS = float(os.environ.get('ORDERS_AUTH_HASH_TARGET_MS', '250'))
+AUTH_HASH_MIN_ROUNDS = int(os.environ.get('ORDERS_AUTH_HASH_MIN_ROUNDS', '10'))
+AUTH_HASH_MAX_ROUNDS = int(os.environ.get('ORDERS_AUTH_HASH_MAX_ROUNDS', '16'))
+AUTH_HASH_ROUNDS = int(os.environ.get('ORDERS_AUTH_HASH_ROUNDS', '0'))
+# Login sessions outlive reconnects and restarts. A session token expires after
+# SESSION_TTL idle seconds, renewed while the app is in use, and at the latest
+# SESSION_MAX_AGE seconds after login; validated sessions are cached in memory for
+# up to SESSION_CACHE_TTL seconds, so a revocation elsewhere lands within it
+SESSION_TTL = float(os.environ.get('ORDERS_SESSION_TTL', str(30 * 60)))
+SESSION_MAX_AGE = float(os.environ.get('ORDERS_SESSION_MAX_AGE', str(12 * 60 * 60)))
+SESSION_CACHE_SIZE = int(os.environ.get('ORDERS_SESSION_CACHE_SIZE', '1024'))
+SESSION_CACHE_TTL = float(os.environ.get('ORDERS_SESSION_CACHE_TTL', '60'))
 
-# Connection pooling and context manager for database operations
-@contextmanager
-def get_db_connection():
-    """Context manager for database connections with connection reuse"""
-    if not hasattr(thread_local, 'connection'):
-        thread_local.connection = sqlite3.connect('orders.db', check_same_thread=False)
-        thread_local.connection.row_factory = sqlite3.Row  # Enable dict-like access
-    
-    try:
-        yield thread_local.connection
-    except Exception as e:
-        thread_local.connection.rollback()
-        logger.error(f"Database error: {str(e)}")
-        raise
-    finally:
-        # Don't close connection, keep it for reuse
-        pass
+# Registry of the app's read queries, so their plans can be checked at startup. Scoped
+# queries take {where} from _order_scope_filter(scope, alias); chunked ones take one
+# chunk of ids as {placeholders}.
+RegisteredQuery = namedtuple('RegisteredQuery', ['sql', 'alias', 'allow_scan', 'allow_temp_btree'])
+QUERY_REGISTRY = {}
+
+def register_query(name, sql, alias=None, allow_scan=False, allow_temp_btree=False):
+    """Record a query for the plan check and hand its SQL back for use"""
+    QUERY_REGISTRY[name] = RegisteredQuery(sql, alias, allow_scan, allow_temp_btree)
+    return sql
+
+def check_query_plans(conn):
+    """EXPLAIN QUERY PLAN every registered query and warn on full scans and temp B-trees
+
+    Scoped queries are explained for each scope; the unfiltered admin+archived scope
+    reads every order by design, so only temp B-trees are flagged there.
+    """
+    warnings = []
+    for name, query in QUERY_REGISTRY.items():
+        if query.alias:
+            variants = [(f"{name} [{label}]", _order_scope_filter(scope, query.alias)[0]) for label, scope in (
+                ('user', OrderScope(None, False, False)),
+                ('admin', OrderScope(None, True, False)),
+                ('admin+archived', OrderScope(None, True, True)))]
+        else:
+            variants = [(name, None)]
+        for label, where in variants:
+            sql = query.sql.format(where=where, placeholders='?,?')
+            allow_scan = query.allow_scan or where == '1'
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * sql.count('?')).fetchall():
+                detail = row[3]
+                if (detail.startswith('SCAN ') and 'CONSTANT ROW' not in detail and not allow_scan) or \
+                        ('USE TEMP B-TREE' in detail and not query.allow_temp_btree):
+                    warnings.append(f"{label}: {detail}")
+    for warning in warnings:
+        logger.warning(f"Query plan: {warning}")
+    return warnings
+
+# Reference data (stages and the services list) with cheap version-based refresh
+REF_DATA_VERSION_SQL = register_query('ref_data_version', "SELECT version FROM ref_data_version WHERE id = 1")
+STAGES_SQL = register_query('stages', "SELECT id, name, position FROM stages ORDER BY position", allow_scan=True)
+SERVICES_LIST_SQL = register_query('services_list', "SELECT id, name FROM services_list", allow_scan=True)
+RefData = namedtuple('RefData', ['version', 'stages', 'services'])
+
+class RefDataCache:
+    """Stages and services list, refreshed when ref_data_version moves
+
+    Triggers on stages and services_list bump ref_data_version on every write from
+    any process. The version row is read at most once per check_interval, so
+    lookups never query, and a refresh swaps in a new RefData snapshot read in one
+    transaction. on_change callbacks run after the first refresh of a new version.
+    """
+
+    def __init__(self, check_interval=REFDATA_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.on_change = []
+        self._data = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        data = self._data
+        if data is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return data
+        with self._lock:
+            if self._data is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._data
+            with get_db_connection(readonly=True) as conn:
+                version = conn.execute(REF_DATA_VERSION_SQL).fetchone()[0]
+                if self._data is None or version != self._data.version:
+                    previous, self._data = self._data, self._load(conn)
+                    if previous is not None:
+                        logger.info(f"Reference data changed (version {previous.version} -> {self._data.version})")
+                        for callback in self.on_change:
+                            callback()
+            self._checked_at = time.monotonic()
+            return self._data
+
+    def _load(self, conn):
+        in_transaction = conn.in_transaction
+        if not in_transaction:
+            conn.execute("BEGIN")
+        try:
+            version = conn.execute(REF_DATA_VERSION_SQL).fetchone()[0]
+            stages = conn.execute(STAGES_SQL).fetchall()
+            services = conn.execute(SERVICES_LIST_SQL).fetchall()
+        finally:
+            if not in_transaction:
+                conn.rollback()
+        return RefData(version,
+                       tuple((row['id'], row['name'], row['position']) for row in stages),
+                       tuple((row['id'], row['name']) for row in services))
+
+    def invalidate(self):
+        """Force a version check on the next lookup"""
+        self._checked_at = 0.0
+
+@st.cache_resource
+def get_ref_data_cache():
+    """Process-wide reference data; a new version also drops the dashboard views"""
+    cache = RefDataCache()
+    cache.on_change.append(lambda: get_dashboard_engine().clear())
+    cache.on_change.append(lambda: recompute_order_progress(wait=False))
+    return cache
 
-# Cache frequently accessed data
-@lru_cache(maxsize=128)
 def get_stages_cached():
-    """Cached version of get_stages to avoid repeated DB queries"""
+    """Cached stages as (id, name, position), ordered by position"""
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT id, name, position FROM stages ORDER BY position")
-            stages = c.fetchall()
-            return [(row['id'], row['name'], row['position']) for row in stages]
+        return get_ref_data_cache().get().stages
     except Exception as e:
         logger.error(f"Error in get_stages_cached: {str(e)}")
-        return []
+        return ()
 
-@lru_cache(maxsize=128)
 def get_services_list_cached():
-    """Cached version of get_services_list"""
+    """Cached services list as (id, name)"""
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT id, name FROM services_list")
-            services = c.fetchall()
-            return [(row['id'], row['name']) for row in services]
+        return get_ref_data_cache().get().services
     except Exception as e:
         logger.error(f"Error in get_services_list_cached: {str(e)}")
-        return []
+        return ()
+
+# Timestamps are stored as INTEGER milliseconds since the Unix epoch, UTC
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+def now_ms():
+    return int(time.time() * 1000)
+
+def new_uuid7():
+    """16-byte time-ordered UUIDv7: 48-bit millisecond timestamp, then random bits"""
+    value = (now_ms() & ((1 << 48) - 1)) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return value.to_bytes(16, 'big')
+
+def _uuid_blob(text):
+    # Legacy TEXT keys become their 16 bytes; anything that is not a UUID is hashed to one
+    try:
+        return uuid.UUID(text).bytes
+    except (TypeError, ValueError, AttributeError):
+        return uuid.uuid5(uuid.NAMESPACE_OID, str(text)).bytes
+
+def _iso_to_epoch_ms(value):
+    # Legacy timestamps are naive datetime.now().isoformat() strings in server local time
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return None
 
 # Optimized database initialization with batch operations
+def _create_ref_data_triggers(conn, table):
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version AFTER {event} ON {table}
+                         BEGIN UPDATE ref_data_version SET version = version + 1 WHERE id = 1; END""")
+
+def _create_baseline_schema(conn):
+    """Tables, triggers and seed data of a version 0 database
+
+    Every statement is idempotent, so databases created before migrations were
+    tracked are adopted as they are.
+    """
+    c = conn.cursor()
+    
+    # Create all tables in a single transaction
+    table_creation_queries = [
+        '''CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            username TEXT UNIQUE,
+            password TEXT,
+            is_admin BOOLEAN
+        )''',
+        '''CREATE TABLE IF NOT EXISTS orders (
+            id TEXT PRIMARY KEY,
+            user_id TEXT,
+            business_name TEXT,
+            email TEXT,
+            phone TEXT,
+            address TEXT,
+            created_at TEXT,
+            archived BOOLEAN DEFAULT 0,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS services (
+            id TEXT PRIMARY KEY,
+            order_id TEXT,
+            name TEXT,
+            stage TEXT,
+            is_template BOOLEAN,
+            template_services TEXT,
+            FOREIGN KEY(order_id) REFERENCES orders(id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS stages (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            position INTEGER
+        )''',
+        '''CREATE TABLE IF NOT EXISTS services_list (
+            id TEXT PRIMARY KEY,
+            name TEXT
+        )''',
+        '''CREATE TABLE IF NOT EXISTS custom_fields (
+            id TEXT PRIMARY KEY,
+            name TEXT
+        )''',
+        '''CREATE TABLE IF NOT EXISTS password_resets (
+            id TEXT PRIMARY KEY,
+            user_id TEXT,
+            temp_password TEXT,
+            requested_at TEXT,
+            approved BOOLEAN,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS changes (
+            id TEXT PRIMARY KEY,
+            order_id TEXT,
+            user_id TEXT,
+            description TEXT,
+            timestamp TEXT,
+            FOREIGN KEY(order_id) REFERENCES orders(id),
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS ref_data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )'''
+    ]
+    
+    # Execute all table creation queries
+    for query in table_creation_queries:
+        c.execute(query)
+    
+    # Any write to reference data bumps its version so every process can see it cheaply
+    c.execute("INSERT OR IGNORE INTO ref_data_version (id, version) VALUES (1, 0)")
+    for table in ('stages', 'services_list'):
+        _create_ref_data_triggers(conn, table)
+    
+    # Initialize default data only if tables are empty
+    c.execute("SELECT COUNT(*) FROM stages")
+    if c.fetchone()[0] == 0:
+        default_stages = [
+            (str(uuid.uuid4()), "To Do", 1),
+            (str(uuid.uuid4()), "In Progress", 2),
+            (str(uuid.uuid4()), "Done", 3)
+        ]
+        c.executemany("INSERT INTO stages (id, name, position) VALUES (?, ?, ?)", default_stages)
+    
+    c.execute("SELECT COUNT(*) FROM services_list")
+    if c.fetchone()[0] == 0:
+        default_services = [
+            (str(uuid.uuid4()), "Research"),
+            (str(uuid.uuid4()), "Design"),
+            (str(uuid.uuid4()), "Development")
+        ]
+        c.executemany("INSERT INTO services_list (id, name) VALUES (?, ?)", default_services)
+    
+    c.execute("SELECT COUNT(*) FROM users WHERE username = ?", ('chadillac',))
+    if c.fetchone()[0] == 0:
+        hashed = get_password_policy().hash('roostersgrin')
+        c.execute("INSERT INTO users (id, username, password, is_admin) VALUES (?, ?, ?, ?)",
+                 (str(uuid.uuid4()), 'chadillac', hashed, True))
+
+def _add_order_progress_column(conn):
+    # Persisted progress, maintained by the write jobs that touch services
+    columns = [column['name'] for column in conn.execute("PRAGMA table_info(orders)").fetchall()]
+    if 'progress' not in columns:
+        conn.execute("ALTER TABLE orders ADD COLUMN progress REAL DEFAULT 0")
+    # Backfilled by migration 4, once ORDER_PROGRESS_SQL's schema exists
+
+def _compact_order_keys(conn):
+    """Rebuild orders, services and changes on INTEGER rowid keys
+
+    The old TEXT UUIDs of orders and services are kept as 16-byte BLOBs in a uuid
+    column; services.order_id and changes.order_id are rewritten to the new integer
+    order keys. Rows are copied in creation order so rowids follow it, and changes
+    keep their feed order.
+    """
+    conn.create_function('uuid_blob', 1, _uuid_blob, deterministic=True)
+    conn.execute('''CREATE TABLE orders_new (
+        id INTEGER PRIMARY KEY,
+        uuid BLOB NOT NULL UNIQUE,
+        user_id TEXT,
+        business_name TEXT,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        created_at TEXT,
+        archived BOOLEAN DEFAULT 0,
+        progress REAL DEFAULT 0,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )''')
+    conn.execute('''INSERT INTO orders_new (uuid, user_id, business_name, email, phone, address, created_at, archived, progress)
+                    SELECT uuid_blob(id), user_id, business_name, email, phone, address, created_at, archived, progress
+                    FROM orders ORDER BY created_at, rowid''')
+    conn.execute('''CREATE TABLE services_new (
+        id INTEGER PRIMARY KEY,
+        uuid BLOB NOT NULL UNIQUE,
+        order_id INTEGER,
+        name TEXT,
+        stage TEXT,
+        is_template BOOLEAN,
+        template_services TEXT,
+        FOREIGN KEY(order_id) REFERENCES orders(id)
+    )''')
+    conn.execute('''INSERT INTO services_new (uuid, order_id, name, stage, is_template, template_services)
+                    SELECT uuid_blob(s.id), o.id, s.name, s.stage, s.is_template, s.template_services
+                    FROM services s LEFT JOIN orders_new o ON o.uuid = uuid_blob(s.order_id)
+                    ORDER BY s.rowid''')
+    conn.execute('''CREATE TABLE changes_new (
+        id INTEGER PRIMARY KEY,
+        order_id INTEGER,
+        user_id TEXT,
+        description TEXT,
+        timestamp TEXT,
+        FOREIGN KEY(order_id) REFERENCES orders(id),
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )''')
+    conn.execute('''INSERT INTO changes_new (order_id, user_id, description, timestamp)
+                    SELECT o.id, c.user_id, c.description, c.timestamp
+                    FROM changes c LEFT JOIN orders_new o ON o.uuid = uuid_blob(c.order_id)
+                    ORDER BY c.rowid''')
+    for table in ('orders', 'services', 'changes'):
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    # Dropping the tables dropped their indexes; recreate migration 1's on the new keys
+    for statement in MIGRATIONS[0]:
+        if statement.startswith("CREATE INDEX") and " ON stages(" not in statement:
+            conn.execute(statement)
+
+def _normalize_service_stages(conn):
+    """Give stages INTEGER keys and point services at them through stage_id
+
+    Stage names are resolved once, here; a name with no matching stage becomes a
+    NULL stage_id, which progress already counts as position 1.
+    """
+    conn.execute('''CREATE TABLE stages_new (
+        id INTEGER PRIMARY KEY,
+        name TEXT,
+        position INTEGER
+    )''')
+    conn.execute("INSERT INTO stages_new (name, position) SELECT name, position FROM stages ORDER BY position, rowid")
+    conn.execute('''CREATE TABLE services_new (
+        id INTEGER PRIMARY KEY,
+        uuid BLOB NOT NULL UNIQUE,
+        order_id INTEGER,
+        name TEXT,
+        stage_id INTEGER,
+        is_template BOOLEAN,
+        template_services TEXT,
+        FOREIGN KEY(order_id) REFERENCES orders(id),
+        FOREIGN KEY(stage_id) REFERENCES stages(id)
+    )''')
+    conn.execute('''INSERT INTO services_new (id, uuid, order_id, name, stage_id, is_template, template_services)
+                    SELECT s.id, s.uuid, s.order_id, s.name,
+                           (SELECT st.id FROM stages_new st WHERE st.name = s.stage ORDER BY st.position DESC LIMIT 1),
+                           s.is_template, s.template_services
+                    FROM services s ORDER BY s.id''')
+    unmatched = conn.execute("SELECT COUNT(*) FROM services_new WHERE stage_id IS NULL").fetchone()[0]
+    if unmatched:
+        logger.warning(f"{unmatched} services had a stage name with no matching stage")
+    for table in ('stages', 'services'):
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_services_order_stage ON services(order_id, stage_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_services_stage_order ON services(stage_id, order_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_services_template ON services(is_template)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_stages_position ON stages(position)")
+    _create_ref_data_triggers(conn, 'stages')
+    _refresh_order_progress(conn)
+    # Stage ids changed, so every process has to reload its reference data
+    conn.execute("UPDATE ref_data_version SET version = version + 1 WHERE id = 1")
+
+def _epoch_ms_timestamps(conn):
+    """Rebuild orders, changes and password_resets with INTEGER epoch millisecond timestamps
+
+    The columns were declared TEXT, whose affinity would turn stored integers back
+    into strings, so the tables are rebuilt rather than updated in place. Row keys
+    are copied as they are.
+    """
+    conn.create_function('iso_to_epoch_ms', 1, _iso_to_epoch_ms, deterministic=True)
+    conn.execute('''CREATE TABLE orders_new (
+        id INTEGER PRIMARY KEY,
+        uuid BLOB NOT NULL UNIQUE,
+        user_id TEXT,
+        business_name TEXT,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        created_at INTEGER,
+        archived BOOLEAN DEFAULT 0,
+        progress REAL DEFAULT 0,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )''')
+    conn.execute('''INSERT INTO orders_new (id, uuid, user_id, business_name, email, phone, address, created_at, archived, progress)
+                    SELECT id, uuid, user_id, business_name, email, phone, address, iso_to_epoch_ms(created_at), archived, progress
+                    FROM orders ORDER BY id''')
+    conn.execute('''CREATE TABLE changes_new (
+        id INTEGER PRIMARY KEY,
+        order_id INTEGER,
+        user_id TEXT,
+        description TEXT,
+        timestamp INTEGER,
+        FOREIGN KEY(order_id) REFERENCES orders(id),
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )''')
+    conn.execute('''INSERT INTO changes_new (id, order_id, user_id, description, timestamp)
+                    SELECT id, order_id, user_id, description, iso_to_epoch_ms(timestamp)
+                    FROM changes ORDER BY id''')
+    conn.execute('''CREATE TABLE password_resets_new (
+        id TEXT PRIMARY KEY,
+        user_id TEXT,
+        temp_password TEXT,
+        requested_at INTEGER,
+        approved BOOLEAN,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )''')
+    conn.execute('''INSERT INTO password_resets_new (id, user_id, temp_password, requested_at, approved)
+                    SELECT id, user_id, temp_password, iso_to_epoch_ms(requested_at), approved
+                    FROM password_resets''')
+    for table in ('orders', 'changes', 'password_resets'):
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS idx_orders_user_archived_created ON orders(user_id, archived, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_archived_created ON orders(archived, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_created ON orders(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_changes_order_timestamp ON changes(order_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_changes_timestamp ON changes(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_password_resets_requested ON password_resets(requested_at)",
+    ):
+        conn.execute(statement)
+
+# Versioned schema migrations, applied in order and tracked in PRAGMA user_version. A
+# migration is a tuple of statements or a callable taking the connection; each runs once,
+# in its own transaction, and under WAL readers carry on while it runs. Append only.
+MIGRATIONS = [
+    # 1: Composite and covering indexes for the dashboard query shapes, replacing the
+    #    single-column indexes they make redundant
+    (
+        "CREATE INDEX IF NOT EXISTS idx_orders_user_archived_created ON orders(user_id, archived, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_archived_created ON orders(archived, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_created ON orders(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_services_order_stage ON services(order_id, stage)",
+        "CREATE INDEX IF NOT EXISTS idx_services_template ON services(is_template)",
+        "CREATE INDEX IF NOT EXISTS idx_changes_order_timestamp ON changes(order_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_changes_timestamp ON changes(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_stages_position ON stages(position)",
+        "CREATE INDEX IF NOT EXISTS idx_stages_name_position ON stages(name, position)",
+        "DROP INDEX IF EXISTS idx_orders_user_id",
+        "DROP INDEX IF EXISTS idx_orders_archived",
+        "DROP INDEX IF EXISTS idx_services_order_id",
+        "DROP INDEX IF EXISTS idx_changes_order_id",
+    ),
+    # 2: Persisted per-order progress
+    _add_order_progress_column,
+    # 3: INTEGER rowid keys for orders, services and changes, UUIDs kept as 16-byte BLOBs
+    _compact_order_keys,
+    # 4: services.stage_id referencing INTEGER stage keys instead of stage names
+    _normalize_service_stages,
+    # 5: INTEGER epoch millisecond timestamps instead of ISO strings
+    _epoch_ms_timestamps,
+    # 6: Login sessions, stored as SHA-256 hashes of their tokens
+    (
+        """CREATE TABLE IF NOT EXISTS sessions (
+            token_hash BLOB PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)",
+    ),
+    # 7: Per-order version, bumped by any write to the order or its services
+    (
+        "ALTER TABLE orders ADD COLUMN version INTEGER NOT NULL DEFAULT 0",
+        """CREATE TRIGGER IF NOT EXISTS orders_update_version
+           AFTER UPDATE OF user_id, business_name, email, phone, address, created_at, archived, progress ON orders
+           BEGIN UPDATE orders SET version = version + 1 WHERE id = NEW.id; END""",
+        """CREATE TRIGGER IF NOT EXISTS services_insert_order_version AFTER INSERT ON services
+           BEGIN UPDATE orders SET version = version + 1 WHERE id = NEW.order_id; END""",
+        """CREATE TRIGGER IF NOT EXISTS services_update_order_version AFTER UPDATE ON services
+           BEGIN UPDATE orders SET version = version + 1 WHERE id IN (OLD.order_id, NEW.order_id); END""",
+        """CREATE TRIGGER IF NOT EXISTS services_delete_order_version AFTER DELETE ON services
+           BEGIN UPDATE orders SET version = version + 1 WHERE id = OLD.order_id; END""",
+    ),
+    # 8: Unknown order creation times (NULL, e.g. unparseable legacy timestamps) stored
+    #    as 0, the value order_sort_key() uses, so keyset paging in SQL reaches them too
+    (
+        "UPDATE orders SET created_at = 0 WHERE created_at IS NULL",
+        """CREATE TRIGGER IF NOT EXISTS orders_insert_created_at AFTER INSERT ON orders WHEN NEW.created_at IS NULL
+           BEGIN UPDATE orders SET created_at = 0 WHERE id = NEW.id; END""",
+    ),
+    # 9: The per-order version of 7 is gone again: the overview is a st.dataframe sent
+    #    whole on every rerun, so there are no per-row fragments for it to key
+    (
+        "DROP TRIGGER IF EXISTS orders_update_version",
+        "DROP TRIGGER IF EXISTS services_insert_order_version",
+        "DROP TRIGGER IF EXISTS services_update_order_version",
+        "DROP TRIGGER IF EXISTS services_delete_order_version",
+        "ALTER TABLE orders DROP COLUMN version",
+    ),
+    # 10: No query looks services up by stage first (per-stage counts are grouped in
+    #     pandas, and foreign keys are not enforced), so 4's stage-first index only
+    #     costs writes
+    (
+        "DROP INDEX IF EXISTS idx_services_stage_order",
+    ),
+]
+
+def apply_migrations(conn):
+    """Bring the schema up to len(MIGRATIONS), one transaction per migration"""
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current == 0:
+        with transaction(conn):
+            _create_baseline_schema(conn)
+    for version, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+        with transaction(conn):
+            # Another process may have applied it while we waited for the write lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                continue
+            if callable(migration):
+                migration(conn)
+            else:
+                for statement in migration:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+        logger.info(f"Applied schema migration {version}")
+
 def init_db():
     try:
         with get_db_connection() as conn:
-            c = conn.cursor()
-            
-            # Create all tables in a single transaction
-            table_creation_queries = [
-                '''CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY,
-                    username TEXT UNIQUE,
-                    password TEXT,
-                    is_admin BOOLEAN
-                )''',
-                '''CREATE TABLE IF NOT EXISTS orders (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT,
-                    business_name TEXT,
-                    email TEXT,
-                    phone TEXT,
-                    address TEXT,
-                    created_at TEXT,
-                    archived BOOLEAN DEFAULT 0,
-                    FOREIGN KEY(user_id) REFERENCES users(id)
-                )''',
-                '''CREATE TABLE IF NOT EXISTS services (
-                    id TEXT PRIMARY KEY,
-                    order_id TEXT,
-                    name TEXT,
-                    stage TEXT,
-                    is_template BOOLEAN,
-                    template_services TEXT,
-                    FOREIGN KEY(order_id) REFERENCES orders(id)
-                )''',
-                '''CREATE TABLE IF NOT EXISTS stages (
-                    id TEXT PRIMARY KEY,
-                    name TEXT,
-                    position INTEGER
-                )''',
-                '''CREATE TABLE IF NOT EXISTS services_list (
-                    id TEXT PRIMARY KEY,
-                    name TEXT
-                )''',
-                '''CREATE TABLE IF NOT EXISTS custom_fields (
-                    id TEXT PRIMARY KEY,
-                    name TEXT
-                )''',
-                '''CREATE TABLE IF NOT EXISTS password_resets (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT,
-                    temp_password TEXT,
-                    requested_at TEXT,
-                    approved BOOLEAN,
-                    FOREIGN KEY(user_id) REFERENCES users(id)
-                )''',
-                '''CREATE TABLE IF NOT EXISTS changes (
-                    id TEXT PRIMARY KEY,
-                    order_id TEXT,
-                    user_id TEXT,
-                    description TEXT,
-                    timestamp TEXT,
-                    FOREIGN KEY(order_id) REFERENCES orders(id),
-                    FOREIGN KEY(user_id) REFERENCES users(id)
-                )'''
-            ]
-            
-            # Execute all table creation queries
-            for query in table_creation_queries:
-                c.execute(query)
-            
-            # Create indexes for better query performance
-            index_queries = [
-                "CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders(user_id)",
-                "CREATE INDEX IF NOT EXISTS idx_orders_archived ON orders(archived)",
-                "CREATE INDEX IF NOT EXISTS idx_services_order_id ON services(order_id)",
-                "CREATE INDEX IF NOT EXISTS idx_changes_order_id ON changes(order_id)",
-                "CREATE INDEX IF NOT EXISTS idx_changes_timestamp ON changes(timestamp)",
-                "CREATE INDEX IF NOT EXISTS idx_stages_position ON stages(position)"
-            ]
-            
-            for query in index_queries:
-                c.execute(query)
-            
-            # Initialize default data only if tables are empty
-            c.execute("SELECT COUNT(*) FROM stages")
-            if c.fetchone()[0] == 0:
-                default_stages = [
-                    (str(uuid.uuid4()), "To Do", 1),
-                    (str(uuid.uuid4()), "In Progress", 2),
-                    (str(uuid.uuid4()), "Done", 3)
-                ]
-                c.executemany("INSERT INTO stages (id, name, position) VALUES (?, ?, ?)", default_stages)
-            
-            c.execute("SELECT COUNT(*) FROM services_list")
-            if c.fetchone()[0] == 0:
-                default_services = [
-                    (str(uuid.uuid4()), "Research"),
-                    (str(uuid.uuid4()), "Design"),
-                    (str(uuid.uuid4()), "Development")
-                ]
-                c.executemany("INSERT INTO services_list (id, name) VALUES (?, ?)", default_services)
-            
-            c.execute("SELECT COUNT(*) FROM users WHERE username = ?", ('chadillac',))
-            if c.fetchone()[0] == 0:
-                hashed = bcrypt.hashpw('roostersgrin'.encode('utf-8'), bcrypt.gensalt())
-                c.execute("INSERT INTO users (id, username, password, is_admin) VALUES (?, ?, ?, ?)",
-                         (str(uuid.uuid4()), 'chadillac', hashed, True))
-            
-            conn.commit()
+            # A current schema costs one integer read
+            if conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS):
+                return
+            apply_migrations(conn)
             logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
@@ -177,47 +592,516 @@ def init_db():
         raise
 
 # Optimized helper functions with batch operations and caching
+LOGIN_SQL = register_query('login', "SELECT id, password, is_admin FROM users WHERE username = ?")
+
+def hash_rounds(stored_hash):
+    """bcrypt cost recorded in a $2b$<rounds>$... hash"""
+    if isinstance(stored_hash, str):
+        stored_hash = stored_hash.encode('utf-8')
+    return int(stored_hash.split(b'$')[2])
+
+class PasswordPolicy:
+    """The bcrypt cost new password hashes are made with
+
+    Every bcrypt hash records its own cost, so hashes made under an older policy
+    keep verifying and are upgraded on the next successful login.
+    """
+
+    def __init__(self, rounds):
+        self.rounds = rounds
+
+    @classmethod
+    def calibrate(cls, target_ms=AUTH_HASH_TARGET_MS, min_rounds=AUTH_HASH_MIN_ROUNDS, max_rounds=AUTH_HASH_MAX_ROUNDS):
+        """Policy with the highest cost whose verification fits in target_ms on this host"""
+        # Each extra round doubles the work, so time a cheap hash and extrapolate
+        probe_rounds = 6
+        salt = bcrypt.gensalt(probe_rounds)
+        elapsed_ms = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            bcrypt.hashpw(b'calibration', salt)
+            elapsed_ms = min(elapsed_ms, (time.perf_counter() - start) * 1000)
+        rounds = probe_rounds
+        while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+            rounds += 1
+            elapsed_ms *= 2
+        if rounds < min_rounds:
+            elapsed_ms *= 2 ** (min_rounds - rounds)
+            rounds = min_rounds
+        logger.info(f"bcrypt cost {rounds}, about {elapsed_ms:.0f} ms per verification")
+        return cls(rounds)
+
+    def hash(self, password):
+        if isinstance(password, str):
+            password = password.encode('utf-8')
+        return bcrypt.hashpw(password, bcrypt.gensalt(self.rounds))
+
+    def needs_rehash(self, stored_hash):
+        return hash_rounds(stored_hash) != self.rounds
+
+@st.cache_resource
+def get_password_policy():
+    return PasswordPolicy(AUTH_HASH_ROUNDS) if AUTH_HASH_ROUNDS else PasswordPolicy.calibrate()
+
+class LoginRejected(Exception):
+    """A login attempt refused before its password was checked"""
+
+# Messages for the AuthService.verify() outcomes that refuse an attempt outright
+LOGIN_REJECTIONS = {
+    'throttled': "Too many failed login attempts. Please try again later.",
+    'busy': "The server is busy. Please try again in a moment.",
+}
+
+class AuthService:
+    """Password verification off the script thread
+
+    bcrypt releases the GIL while hashing, so a small thread pool keeps a login
+    burst to `workers` cores and leaves the rest for dashboard reruns. Attempts
+    beyond max_pending queued verifications are refused outright. Unknown usernames
+    are checked against a dummy hash so they cost the same as known ones, and
+    after too many failures within throttle_window a username is refused until
+    its older failures age out. Hashes whose cost is off policy are rehashed in
+    the background after a successful login.
+
+    The service is cached across reruns, so it reports outcomes as strings
+    rather than raising classes defined by the script run that created it.
+    """
+
+    def __init__(self, policy, workers=AUTH_WORKERS, max_pending=AUTH_MAX_PENDING, timeout=AUTH_TIMEOUT,
+                 throttle_window=AUTH_THROTTLE_WINDOW, max_failures_per_user=AUTH_MAX_FAILURES_PER_USER):
+        self.policy = policy
+        self.timeout = timeout
+        self.throttle_window = throttle_window
+        self.max_failures_per_user = max_failures_per_user
+        self.stats = {'verified': 0, 'failed': 0, 'throttled': 0, 'busy': 0, 'rehashed': 0}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='auth')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._failures = {}
+        self._lock = threading.Lock()
+        # Made under the current policy, so unknown usernames cost what known ones do
+        self._dummy_hash = policy.hash(os.urandom(16))
+
+    def verify(self, username, password, stored_hash):
+        """Check password against stored_hash, which is None for unknown usernames
+
+        Returns 'verified' or 'failed', or 'throttled' / 'busy' when the attempt is
+        refused without checking the password.
+        """
+        if self._throttled(username):
+            self.stats['throttled'] += 1
+            return 'throttled'
+        if not self._slots.acquire(blocking=False):
+            self.stats['busy'] += 1
+            return 'busy'
+        try:
+            future = self._executor.submit(bcrypt.checkpw, password.encode('utf-8'), stored_hash or self._dummy_hash)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot frees when the hash finishes, even if this caller gave up waiting
+        future.add_done_callback(lambda f: self._slots.release())
+        try:
+            matched = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The hash is still queued behind others: refuse like a full pool, not as a wrong password
+            self.stats['busy'] += 1
+            return 'busy'
+        if matched and stored_hash is not None:
+            self.stats['verified'] += 1
+            return 'verified'
+        self.stats['failed'] += 1
+        self._record_failure(username)
+        return 'failed'
+
+    def upgrade(self, user_id, password, stored_hash):
+        """Rehash a just-verified password in the background if its cost is off policy
+
+        The rehash counts against max_pending like a verification; when the pool is
+        saturated it is skipped, and the next successful login tries again.
+        """
+        if not self.policy.needs_rehash(stored_hash) or not self._slots.acquire(blocking=False):
+            return
+        try:
+            # Looked up here: the worker thread has no script context to resolve it from
+            future = self._executor.submit(self._rehash, get_write_queue(), user_id, password, stored_hash)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+
+    def _rehash(self, write_queue, user_id, password, stored_hash):
+        try:
+            write_queue.submit(_set_password_hash, user_id, stored_hash, self.policy.hash(password))
+            self.stats['rehashed'] += 1
+        except Exception as e:
+            logger.error(f"Error rehashing password: {str(e)}")
+
+    def _throttled(self, username):
+        cutoff = time.monotonic() - self.throttle_window
+        with self._lock:
+            failures = self._failures.get(username)
+            if not failures:
+                return False
+            while failures and failures[0] < cutoff:
+                failures.popleft()
+            if not failures:
+                del self._failures[username]
+                return False
+            return len(failures) >= self.max_failures_per_user
+
+    def _record_failure(self, username):
+        now = time.monotonic()
+        with self._lock:
+            self._failures.setdefault(username, deque()).append(now)
+            if len(self._failures) > 10000:
+                # Forget usernames whose latest failure is already outside the window
+                cutoff = now - self.throttle_window
+                self._failures = {key: failures for key, failures in self._failures.items() if failures[-1] >= cutoff}
+
+@st.cache_resource
+def get_auth_service():
+    return AuthService(get_password_policy())
+
 def check_login(username, password):
+    """The session user for valid credentials, otherwise None
+
+    Raises LoginRejected when the attempt is throttled or the server is too busy to check it.
+    """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            c.execute("SELECT id, password, is_admin FROM users WHERE username = ?", (username,))
+            c.execute(LOGIN_SQL, (username,))
             user = c.fetchone()
-            if user and bcrypt.checkpw(password.encode('utf-8'), user['password']):
-                return {'id': user['id'], 'username': username, 'is_admin': user['is_admin']}
-        return None
+        auth = get_auth_service()
+        outcome = auth.verify(username, password, user['password'] if user else None)
+        if outcome == 'verified':
+            auth.upgrade(user['id'], password, user['password'])
+            return {'id': user['id'], 'username': username, 'is_admin': user['is_admin']}
     except Exception as e:
         logger.error(f"Error in check_login: {str(e)}")
         return None
+    if outcome in LOGIN_REJECTIONS:
+        raise LoginRejected(LOGIN_REJECTIONS[outcome])
+    return None
+
+SESSION_SQL = register_query('session', """
+    SELECT u.id, u.username, u.is_admin, s.created_at, s.expires_at
+    FROM sessions s JOIN users u ON u.id = s.user_id
+    WHERE s.token_hash = ? AND s.expires_at > ?
+""")
+
+def _token_hash(token):
+    # Tokens are 256 random bits, so a fast hash is enough to keep them out of the database
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+class SessionStore:
+    """Persistent login sessions behind an in-memory LRU
+
+    Only token hashes are stored. Validation is one primary-key lookup, answered
+    from the LRU for up to cache_ttl seconds; no bcrypt work is involved. A session
+    idle for ttl seconds expires; renew() slides the expiry forward, up to max_age
+    seconds after the session was created.
+    """
+
+    def __init__(self, ttl=SESSION_TTL, max_age=SESSION_MAX_AGE, cache_size=SESSION_CACHE_SIZE,
+                 cache_ttl=SESSION_CACHE_TTL):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.stats = {'hits': 0, 'lookups': 0, 'created': 0, 'renewed': 0, 'revoked': 0}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, user):
+        """Start a session for a logged-in user and return its token"""
+        token = secrets.token_urlsafe(32)
+        token_hash = _token_hash(token)
+        now = now_ms()
+        renewable_until = now + int(self.max_age * 1000)
+        expires_at = min(now + int(self.ttl * 1000), renewable_until)
+        submit_write(_create_session, token_hash, user['id'], now, expires_at)
+        self._remember(token_hash, user, expires_at, renewable_until)
+        self.stats['created'] += 1
+        return token
+
+    def renew(self, token):
+        """The session user for a live token, otherwise None, pushing its expiry out
+
+        The expiry only moves once less than half of ttl is left, so a busy session
+        costs one write per ttl / 2 rather than one per rerun.
+        """
+        user = self.validate(token)
+        if user is None:
+            return None
+        token_hash = _token_hash(token)
+        now = now_ms()
+        with self._lock:
+            entry = self._cache.get(token_hash)
+        if entry is None:
+            return user
+        _, expires_at, renewable_until, _ = entry
+        if expires_at - now > self.ttl * 500 or expires_at >= renewable_until:
+            return user
+        try:
+            expires_at = submit_write(_renew_session, token_hash, now,
+                                      min(now + int(self.ttl * 1000), renewable_until)).result()
+        except LookupError:
+            # Revoked or expired since it was cached
+            with self._lock:
+                self._cache.pop(token_hash, None)
+            return None
+        self._remember(token_hash, user, expires_at, renewable_until)
+        self.stats['renewed'] += 1
+        return user
+
+    def validate(self, token):
+        """The session user for a live token, otherwise None"""
+        if not token:
+            return None
+        token_hash = _token_hash(token)
+        now = now_ms()
+        with self._lock:
+            entry = self._cache.get(token_hash)
+            if entry and entry[1] > now and time.monotonic() - entry[3] < self.cache_ttl:
+                self._cache.move_to_end(token_hash)
+                self.stats['hits'] += 1
+                return entry[0]
+        self.stats['lookups'] += 1
+        with get_db_connection(readonly=True) as conn:
+            row = conn.execute(SESSION_SQL, (token_hash, now)).fetchone()
+        if row is None:
+            with self._lock:
+                self._cache.pop(token_hash, None)
+            return None
+        user = {'id': row['id'], 'username': row['username'], 'is_admin': row['is_admin']}
+        self._remember(token_hash, user, row['expires_at'], row['created_at'] + int(self.max_age * 1000))
+        return user
+
+    def revoke(self, token):
+        if not token:
+            return
+        token_hash = _token_hash(token)
+        with self._lock:
+            self._cache.pop(token_hash, None)
+        submit_write(_delete_session, token_hash)
+        self.stats['revoked'] += 1
+
+    def _remember(self, token_hash, user, expires_at, renewable_until):
+        with self._lock:
+            self._cache[token_hash] = (user, expires_at, renewable_until, time.monotonic())
+            self._cache.move_to_end(token_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+@st.cache_resource
+def get_session_store():
+    return SessionStore()
+
+# The session token rides in the page URL, the one piece of client state Streamlit
+# hands back on every reconnect; it cannot set an HttpOnly cookie. To limit what a
+# leaked URL (history, a copied link, a screen share) is worth, tokens expire after
+# a short idle time and a bounded lifetime, and logging out revokes them. The token
+# stays the same while it lives, so tabs opened from the same URL share the session.
+SESSION_QUERY_PARAM = 'session'
+
+def restore_session():
+    """The user of the session token in the URL, if it is still valid"""
+    try:
+        token = st.query_params.get(SESSION_QUERY_PARAM)
+        if not token:
+            return None
+        user = get_session_store().validate(token)
+        if not user:
+            del st.query_params[SESSION_QUERY_PARAM]
+        return user
+    except Exception as e:
+        logger.error(f"Error in restore_session: {str(e)}")
+        return None
+
+def renew_session():
+    """Keep the session in the URL alive while it is used; False once it has ended"""
+    try:
+        token = st.query_params.get(SESSION_QUERY_PARAM)
+        if not token:
+            return True
+        if get_session_store().renew(token):
+            return True
+        del st.query_params[SESSION_QUERY_PARAM]
+        return False
+    except Exception as e:
+        logger.error(f"Error in renew_session: {str(e)}")
+        return True
+
+def start_session(user):
+    try:
+        st.query_params[SESSION_QUERY_PARAM] = get_session_store().create(user)
+    except Exception as e:
+        logger.error(f"Error in start_session: {str(e)}")
+
+def end_session():
+    try:
+        get_session_store().revoke(st.query_params.get(SESSION_QUERY_PARAM))
+        if SESSION_QUERY_PARAM in st.query_params:
+            del st.query_params[SESSION_QUERY_PARAM]
+    except Exception as e:
+        logger.error(f"Error in end_session: {str(e)}")
+
+# The set of orders a dashboard shows; the listing and the per-order batch fetches share it
+OrderScope = namedtuple('OrderScope', ['user_id', 'is_admin', 'include_archived'])
+
+def _order_scope_filter(scope, alias='orders'):
+    """WHERE clause and parameters selecting the orders visible in scope"""
+    conditions, params = [], []
+    if not scope.is_admin:
+        conditions.append(f"{alias}.user_id = ?")
+        params.append(scope.user_id)
+    if not (scope.is_admin and scope.include_archived):
+        conditions.append(f"{alias}.archived = 0")
+    return ' AND '.join(conditions) or '1', params
+
+def _fetch_for_order_ids(conn, query, order_ids):
+    """Run query, whose IN list is {placeholders}, over order_ids in fixed-size chunks"""
+    rows = []
+    for start in range(0, len(order_ids), SQL_IN_CHUNK_SIZE):
+        chunk = order_ids[start:start + SQL_IN_CHUNK_SIZE]
+        rows.extend(conn.execute(query.format(placeholders=','.join('?' * len(chunk))), chunk).fetchall())
+    return rows
+
+# Compact row records for the materialized dashboard: fields live in __slots__, so a
+# record has no per-instance __dict__, and repetitive text fields are interned so every
+# record with the same user, service or stage name shares one string
+class Record:
+    __slots__ = ()
+    _interned = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            if field in self._interned and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*[row[field] for field in cls.__slots__])
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __reduce__(self):
+        # Pickles as the class plus a flat tuple of values, re-interned on load
+        return type(self), self._values()
+
+    def __repr__(self):
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class OrderRecord(Record):
+    __slots__ = ('id', 'uuid', 'user_id', 'business_name', 'email', 'phone', 'address', 'created_at', 'archived', 'progress')
+    _interned = ('user_id',)
+
+class ServiceRecord(Record):
+    __slots__ = ('id', 'order_id', 'name', 'stage_id', 'stage', 'is_template', 'template_services')
+    _interned = ('name', 'stage')
+
+class ChangeRecord(Record):
+    __slots__ = ('order_id', 'description', 'timestamp')
+    _interned = ('description',)
+
+ORDERS_SQL = register_query('orders', "SELECT * FROM orders WHERE {where} ORDER BY created_at DESC, id DESC", alias='orders')
+ORDERS_PAGE_SQL = register_query('orders_page', """
+    SELECT * FROM orders WHERE {where} AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?
+""", alias='orders')
+ORDERS_BY_ID_SQL = register_query('orders_by_id', "SELECT * FROM orders WHERE id IN ({placeholders})")
 
 def get_user_orders_optimized(user_id, is_admin=False, include_archived=False):
     """Optimized version with single query and proper indexing"""
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            if is_admin and include_archived:
-                c.execute("SELECT * FROM orders ORDER BY created_at DESC")
-            elif is_admin:
-                c.execute("SELECT * FROM orders WHERE archived = 0 ORDER BY created_at DESC")
-            else:
-                c.execute("SELECT * FROM orders WHERE user_id = ? AND archived = 0 ORDER BY created_at DESC", (user_id,))
+            where, params = _order_scope_filter(OrderScope(user_id, is_admin, include_archived))
+            c.execute(ORDERS_SQL.format(where=where), params)
             orders = c.fetchall()
-            return [dict(row) for row in orders]
+            return [OrderRecord.from_row(row) for row in orders]
     except Exception as e:
         logger.error(f"Error in get_user_orders_optimized: {str(e)}")
         return []
 
-def get_order_services_batch(order_ids):
-    """Batch fetch services for multiple orders"""
+def order_sort_key(order):
+    """Keyset position of an order; listings run newest first on this key
+
+    An unknown creation time counts as 0, as migration 8 stores it.
+    """
+    return (order.created_at or 0, order.id)
+
+def get_orders_page(user_id, is_admin=False, include_archived=False, after=None, page_size=ORDERS_PAGE_SIZE, pool=None):
+    """One page of orders, newest first, read straight off the (created_at, id) indexes
+
+    after is the cursor returned with the previous page. Returns (orders, next_cursor),
+    where next_cursor is None on the last page. pool is the read pool to use off the
+    script thread.
+    """
+    try:
+        with get_db_connection(readonly=True, pool=pool) as conn:
+            where, params = _order_scope_filter(OrderScope(user_id, is_admin, include_archived))
+            if after is None:
+                rows = conn.execute(ORDERS_SQL.format(where=where) + " LIMIT ?", params + [page_size + 1]).fetchall()
+            else:
+                rows = conn.execute(ORDERS_PAGE_SQL.format(where=where), params + list(after) + [page_size + 1]).fetchall()
+        orders = [OrderRecord.from_row(row) for row in rows[:page_size]]
+        return orders, order_sort_key(orders[-1]) if len(rows) > page_size else None
+    except Exception as e:
+        logger.error(f"Error in get_orders_page: {str(e)}")
+        return [], None
+
+def page_orders(orders, after=None, page_size=ORDERS_PAGE_SIZE):
+    """The same keyset page taken from an in-memory order list sorted newest first"""
+    start, end = 0, len(orders)
+    if after is not None:
+        while start < end:
+            middle = (start + end) // 2
+            if order_sort_key(orders[middle]) < after:
+                end = middle
+            else:
+                start = middle + 1
+    page = orders[start:start + page_size]
+    return page, order_sort_key(page[-1]) if start + page_size < len(orders) else None
+
+@st.cache_resource
+def get_prefetch_executor():
+    """Small thread pool that loads the next order page while the current one renders"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='orders-prefetch')
+
+SCOPE_SERVICES_SQL = register_query('scope_services', """
+    SELECT s.id, s.order_id, s.name, s.stage_id, st.name AS stage, s.is_template, s.template_services
+    FROM services s JOIN orders o ON o.id = s.order_id LEFT JOIN stages st ON st.id = s.stage_id
+    WHERE {where}
+""", alias='o')
+SERVICES_BY_ORDER_SQL = register_query('services_by_order', """
+    SELECT s.id, s.order_id, s.name, s.stage_id, st.name AS stage, s.is_template, s.template_services
+    FROM services s LEFT JOIN stages st ON st.id = s.stage_id
+    WHERE s.order_id IN ({placeholders})
+""")
+
+def get_order_services_batch(order_ids, scope=None):
+    """Batch fetch services for multiple orders
+
+    With a scope, services are joined to the orders it selects in one query;
+    otherwise order_ids are looked up in chunks.
+    """
     if not order_ids:
         return {}
     
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            placeholders = ','.join('?' * len(order_ids))
-            c.execute(f"SELECT id, order_id, name, stage, is_template, template_services FROM services WHERE order_id IN ({placeholders})", order_ids)
-            services = c.fetchall()
+        with get_db_connection(readonly=True) as conn:
+            if scope is not None:
+                where, params = _order_scope_filter(scope, 'o')
+                services = conn.execute(SCOPE_SERVICES_SQL.format(where=where), params).fetchall()
+            else:
+                services = _fetch_for_order_ids(conn, SERVICES_BY_ORDER_SQL, order_ids)
             
             # Group services by order_id
             services_by_order = {}
@@ -225,29 +1109,44 @@ def get_order_services_batch(order_ids):
                 order_id = service['order_id']
                 if order_id not in services_by_order:
                     services_by_order[order_id] = []
-                services_by_order[order_id].append(dict(service))
+                services_by_order[order_id].append(ServiceRecord.from_row(service))
             
             return services_by_order
     except Exception as e:
         logger.error(f"Error in get_order_services_batch: {str(e)}")
         return {}
 
-def get_order_changes_batch(order_ids):
-    """Batch fetch changes for multiple orders"""
+# Full histories are sorted across orders, which needs a temp B-tree; the dashboard avoids them
+SCOPE_CHANGES_SQL = register_query('scope_changes', """
+    SELECT c.order_id, c.description, c.timestamp
+    FROM changes c JOIN orders o ON o.id = c.order_id
+    WHERE {where}
+    ORDER BY c.timestamp DESC
+""", alias='o', allow_temp_btree=True)
+CHANGES_BY_ORDER_SQL = register_query('changes_by_order', """
+    SELECT order_id, description, timestamp 
+    FROM changes 
+    WHERE order_id IN ({placeholders}) 
+    ORDER BY timestamp DESC
+""", allow_temp_btree=True)
+
+def get_order_changes_batch(order_ids, scope=None):
+    """Batch fetch changes for multiple orders
+
+    With a scope, changes are joined to the orders it selects in one query;
+    otherwise order_ids are looked up in chunks.
+    """
     if not order_ids:
         return {}
     
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            placeholders = ','.join('?' * len(order_ids))
-            c.execute(f"""
-                SELECT order_id, description, timestamp 
-                FROM changes 
-                WHERE order_id IN ({placeholders}) 
-                ORDER BY timestamp DESC
-            """, order_ids)
-            changes = c.fetchall()
+        with get_db_connection(readonly=True) as conn:
+            if scope is not None:
+                where, params = _order_scope_filter(scope, 'o')
+                changes = conn.execute(SCOPE_CHANGES_SQL.format(where=where), params).fetchall()
+            else:
+                # Each order falls in a single chunk, so its changes stay newest first
+                changes = _fetch_for_order_ids(conn, CHANGES_BY_ORDER_SQL, order_ids)
             
             # Group changes by order_id
             changes_by_order = {}
@@ -255,69 +1154,360 @@ def get_order_changes_batch(order_ids):
                 order_id = change['order_id']
                 if order_id not in changes_by_order:
                     changes_by_order[order_id] = []
-                changes_by_order[order_id].append(dict(change))
+                changes_by_order[order_id].append(ChangeRecord.from_row(change))
             
             return changes_by_order
     except Exception as e:
         logger.error(f"Error in get_order_changes_batch: {str(e)}")
         return {}
 
-def calculate_order_progress_batch(order_ids, services_by_order):
-    """Calculate progress for multiple orders efficiently"""
-    stages = get_stages_cached()
-    stage_positions = {stage[1]: stage[2] for stage in stages}
-    total_stages = max(stage_positions.values()) if stage_positions else 1
+SCOPE_LAST_CHANGE_SQL = register_query('scope_last_change', """
+    SELECT o.id, (SELECT MAX(c.timestamp) FROM changes c WHERE c.order_id = o.id)
+    FROM orders o
+    WHERE {where}
+""", alias='o')
+LAST_CHANGE_BY_ORDER_SQL = register_query('last_change_by_order', "SELECT order_id, MAX(timestamp) FROM changes WHERE order_id IN ({placeholders}) GROUP BY order_id")
+
+def get_last_change_batch(order_ids, scope=None):
+    """Timestamp of the most recent change for each order that has one
+
+    Answered with one index seek per order on idx_changes_order_timestamp,
+    without reading the change history itself.
+    """
+    if not order_ids:
+        return {}
     
-    progress_by_order = {}
-    for order_id in order_ids:
-        services = services_by_order.get(order_id, [])
-        if not services:
-            progress_by_order[order_id] = 0
-            continue
-        
-        total_position = sum(stage_positions.get(service['stage'], 1) for service in services)
-        avg_position = total_position / len(services)
-        progress = (avg_position / total_stages) * 100
-        progress_by_order[order_id] = round(progress, 2)
+    try:
+        with get_db_connection(readonly=True) as conn:
+            if scope is not None:
+                where, params = _order_scope_filter(scope, 'o')
+                rows = conn.execute(SCOPE_LAST_CHANGE_SQL.format(where=where), params).fetchall()
+            else:
+                rows = _fetch_for_order_ids(conn, LAST_CHANGE_BY_ORDER_SQL, order_ids)
+            return {row[0]: row[1] for row in rows if row[1] is not None}
+    except Exception as e:
+        logger.error(f"Error in get_last_change_batch: {str(e)}")
+        return {}
+
+def get_order_changes(order_id):
+    """Full change history of one order, newest first; loaded only when the order is opened"""
+    return get_order_changes_batch([order_id]).get(order_id, [])
+
+# Progress of one order: the mean stage position of its services over the last stage
+# position, as a percentage; unknown stages count as position 1 and no services as 0
+ORDER_PROGRESS_SQL = """COALESCE((
+    SELECT ROUND(AVG(COALESCE(st.position, 1))
+                 / COALESCE(NULLIF((SELECT MAX(position) FROM stages), 0), 1) * 100, 2)
+    FROM services s LEFT JOIN stages st ON st.id = s.stage_id WHERE s.order_id = {order_id}
+), 0)"""
+
+SCOPE_PROGRESS_SQL = register_query('scope_progress', "SELECT o.id, " + ORDER_PROGRESS_SQL.format(order_id='o.id') + " FROM orders o WHERE {where}", alias='o')
+PROGRESS_BY_ORDER_SQL = register_query('progress_by_order', "SELECT o.id, " + ORDER_PROGRESS_SQL.format(order_id='o.id') + " FROM orders o WHERE o.id IN ({placeholders})")
+
+def get_order_progress_batch(order_ids, scope=None):
+    """Progress for multiple orders, aggregated in SQLite
+
+    With a scope, progress is computed for every order it selects in one query;
+    otherwise order_ids are looked up in chunks.
+    """
+    if not order_ids:
+        return {}
     
-    return progress_by_order
-
-def get_days_since_last_change_batch(order_ids, changes_by_order):
-    """Calculate days since last change for multiple orders"""
-    days_by_order = {}
-    for order_id in order_ids:
-        changes = changes_by_order.get(order_id, [])
-        if changes:
-            last_change_time = datetime.fromisoformat(changes[0]['timestamp'])
-            days_diff = (datetime.now() - last_change_time).days
-            days_by_order[order_id] = days_diff
+    try:
+        with get_db_connection(readonly=True) as conn:
+            if scope is not None:
+                where, params = _order_scope_filter(scope, 'o')
+                rows = conn.execute(SCOPE_PROGRESS_SQL.format(where=where), params).fetchall()
+            else:
+                rows = _fetch_for_order_ids(conn, PROGRESS_BY_ORDER_SQL, order_ids)
+            progress_by_order = {row[0]: row[1] for row in rows}
+            return {order_id: progress_by_order.get(order_id, 0) for order_id in order_ids}
+    except Exception as e:
+        logger.error(f"Error in get_order_progress_batch: {str(e)}")
+        return {order_id: 0 for order_id in order_ids}
+
+def get_days_since_last_change_batch(order_ids, last_change_by_order):
+    """Whole days since the last change of each order, None for orders without one"""
+    now = now_ms()
+    return {order_id: (now - last_change_by_order[order_id]) // MS_PER_DAY if order_id in last_change_by_order else None
+            for order_id in order_ids}
+
+# Columnar metrics: orders and services are loaded into DataFrames once and the
+# per-stage and per-user aggregates are computed with vectorized operations. The
+# per-order figures behind the header come from the DashboardEngine view instead.
+DashboardMetrics = namedtuple('DashboardMetrics', ['orders_per_stage', 'per_user'])
+
+METRICS_ORDERS_SQL = register_query('metrics_orders', """
+    SELECT o.id, o.user_id, (SELECT MAX(c.timestamp) FROM changes c WHERE c.order_id = o.id) AS last_change
+    FROM orders o
+    WHERE {where}
+""", alias='o')
+METRICS_SERVICES_SQL = register_query('metrics_services', """
+    SELECT s.order_id, s.stage_id, st.position
+    FROM services s JOIN orders o ON o.id = s.order_id LEFT JOIN stages st ON st.id = s.stage_id
+    WHERE {where}
+""", alias='o')
+
+def load_metrics_frames(scope):
+    """(orders, services) DataFrames for the orders in scope, read in one snapshot"""
+    where, params = _order_scope_filter(scope, 'o')
+    with read_snapshot() as conn:
+        orders = pd.read_sql(METRICS_ORDERS_SQL.format(where=where), conn, params=params)
+        services = pd.read_sql(METRICS_SERVICES_SQL.format(where=where), conn, params=params)
+    return orders, services
+
+def compute_dashboard_metrics(orders, services, max_position, now=None):
+    """Dashboard aggregates from an orders frame (id, user_id, last_change) and a
+    services frame (order_id, stage_id, position)
+
+    Follows ORDER_PROGRESS_SQL: unknown stages count as position 1 and orders without
+    services as 0 progress. Orders that have never changed are left out of avg_days.
+    """
+    now = now_ms() if now is None else now
+    order_ids = pd.Index(orders['id'], name='order_id')
+    positions = services['position'].astype('float64').fillna(1)
+    progress = (positions.groupby(services['order_id']).mean() / (max_position or 1) * 100).round(2)
+    progress = progress.reindex(order_ids, fill_value=0)
+    days = (now - orders['last_change'].astype('float64')) // MS_PER_DAY
+    staged = services[services['position'].notna()]
+    orders_per_stage = staged.groupby(staged['stage_id'].astype('int64'))['order_id'].nunique()
+    per_user = pd.DataFrame({'user_id': orders['user_id'].to_numpy(), 'progress': progress.to_numpy(), 'days': days.to_numpy()})
+    per_user = per_user.groupby('user_id').agg(orders=('progress', 'size'), avg_progress=('progress', 'mean'),
+                                               avg_days=('days', 'mean'))
+    return DashboardMetrics(orders_per_stage, per_user)
+
+@st.cache_data(ttl=DASHBOARD_TTL, max_entries=256, show_spinner=False)
+def _dashboard_metrics(user_id, is_admin, include_archived, ref_data_version):
+    # ref_data_version only keys the cache, so stage edits show up at once; order
+    # writes are picked up when the entry expires after DASHBOARD_TTL
+    orders, services = load_metrics_frames(OrderScope(user_id, is_admin, include_archived))
+    max_position = max((stage[2] for stage in get_stages_cached()), default=1)
+    return compute_dashboard_metrics(orders, services, max_position)
+
+def get_dashboard_metrics(user_id, is_admin, include_archived=False):
+    """Per-stage and per-user aggregates for the orders in scope, at most DASHBOARD_TTL old"""
+    try:
+        return _dashboard_metrics(user_id, is_admin, include_archived, get_ref_data_cache().get().version)
+    except Exception as e:
+        logger.error(f"Error in get_dashboard_metrics: {str(e)}")
+        return None
+
+# A materialized dashboard tuple plus the last changes rowid already folded into it
+DashboardView = namedtuple('DashboardView', ['data', 'feed_position', 'built_at'])
+
+class DashboardEngine:
+    """One materialized view of every active order, kept current by applying
+    per-order deltas, with per-user projections taken from it
+
+    Every mutation writes a changes row, so the changes table doubles as a change
+    feed: on read, rows past the view's feed position name the orders to re-fetch,
+    and only those orders are patched into the view. The change bus flags new rows
+    from this process at once; other processes' writes are picked up every
+    poll_interval seconds. The view is still rebuilt from scratch after ttl
+    seconds so day counts keep moving; one caller rebuilds while the others wait
+    for its view.
+
+    Admins read the shared view itself. A regular user reads a projection holding
+    references to their own orders' records, built on first use and dropped only
+    when one of their orders changes, so memory grows with the number of orders
+    rather than with the number of sessions.
+    """
+
+    def __init__(self, ttl=DASHBOARD_TTL, poll_interval=DASHBOARD_FEED_POLL_INTERVAL):
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.stats = {'hits': 0, 'builds': 0, 'projections': 0, 'syncs': 0, 'orders_patched': 0}
+        self._view = None
+        self._projections = {}
+        self._dirty = False
+        self._last_sync = 0.0
+        self._generation = 0
+        self._lock = threading.RLock()
+        # Held for the length of a rebuild, so clear() and sync() from other threads
+        # only ever wait on _lock
+        self._build_lock = threading.Lock()
+
+    def _expired(self, view):
+        return view is None or time.monotonic() - view.built_at >= self.ttl
+
+    def get(self, key):
+        user_id, is_admin = key
+        with self._lock:
+            view = self._view
+        if self._expired(view):
+            with self._build_lock:
+                with self._lock:
+                    view, generation = self._view, self._generation
+                if self._expired(view):
+                    # Record the feed position first so anything written during the build is re-applied
+                    feed_position = _get_change_feed_position()
+                    view = DashboardView(_build_dashboard_data(None, True), feed_position, time.monotonic())
+                    with self._lock:
+                        # A clear() during the build means the data may predate it; serve it
+                        # to this caller only
+                        if generation == self._generation:
+                            self._view = view
+                            self._projections.clear()
+                        self.stats['builds'] += 1
+        else:
+            self.stats['hits'] += 1
+
+        if self._dirty or time.monotonic() - self._last_sync >= self.poll_interval:
+            self.sync()
+        with self._lock:
+            # Prefer the view as patched by sync(); if clear() dropped it meanwhile,
+            # answer from the one this call already holds
+            current = self._view is not None
+            if current:
+                view = self._view
+            if is_admin:
+                return view.data
+            projection = self._projections.get(user_id) if current else None
+            if projection is None:
+                projection = _project_dashboard_data(view.data, user_id)
+                if current:
+                    self._projections[user_id] = projection
+                self.stats['projections'] += 1
+            return projection
+
+    def on_changes(self):
+        """Change bus subscriber; the deltas themselves are read back from the feed"""
+        self._dirty = True
+
+    def sync(self):
+        """Fold changes rows written since the view's feed position into the view"""
+        with self._lock:
+            self._dirty = False
+            self._last_sync = time.monotonic()
+            if self._view is None:
+                return
+            feed = _get_change_feed(self._view.feed_position)
+            if not feed:
+                return
+
+            changed_ids = list(dict.fromkeys(order_id for _, order_id in feed))
+            fresh = _load_order_states(changed_ids)
+            # Projections of users who owned a changed order before or after the change are stale
+            stale_users = {order.user_id for order in self._view.data[0] if order.id in fresh}
+            stale_users.update(state[0].user_id for state in fresh.values() if state[0])
+            for user_id in stale_users:
+                self._projections.pop(user_id, None)
+            self._view = self._view._replace(data=_patch_dashboard_data(self._view.data, fresh),
+                                             feed_position=feed[-1][0])
+            self.stats['syncs'] += 1
+            self.stats['orders_patched'] += len(changed_ids)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._view = None
+            self._projections.clear()
+
+@st.cache_resource
+def get_dashboard_engine():
+    """Process-wide dashboard engine, nudged by the change bus"""
+    engine = DashboardEngine()
+    get_change_bus().subscribe(engine.on_changes)
+    return engine
+
+CHANGE_FEED_POSITION_SQL = register_query('change_feed_position', "SELECT COALESCE(MAX(rowid), 0) FROM changes")
+CHANGE_FEED_SQL = register_query('change_feed', "SELECT rowid, order_id FROM changes WHERE rowid > ? ORDER BY rowid")
+
+def _get_change_feed_position():
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(CHANGE_FEED_POSITION_SQL).fetchone()[0]
+
+def _get_change_feed(after_position):
+    """(rowid, order_id) of every changes row past after_position, oldest first"""
+    with get_db_connection(readonly=True) as conn:
+        c = conn.execute(CHANGE_FEED_SQL, (after_position,))
+        return [(row[0], row[1]) for row in c.fetchall()]
+
+def _load_order_states(order_ids):
+    """Current row, services, last change, progress and days for just these orders"""
+    with read_snapshot() as conn:
+        rows = _fetch_for_order_ids(conn, ORDERS_BY_ID_SQL, order_ids)
+        orders = {row['id']: OrderRecord.from_row(row) for row in rows}
+        services_by_order = get_order_services_batch(order_ids)
+        last_change_by_order = get_last_change_batch(order_ids)
+        if DASHBOARD_PERSISTED_PROGRESS:
+            progress_by_order = {order_id: orders[order_id].progress if order_id in orders else 0 for order_id in order_ids}
         else:
-            days_by_order[order_id] = None
+            progress_by_order = get_order_progress_batch(order_ids)
+    days_by_order = get_days_since_last_change_batch(order_ids, last_change_by_order)
+    return {order_id: (orders.get(order_id), services_by_order.get(order_id), last_change_by_order.get(order_id),
+                       progress_by_order[order_id], days_by_order[order_id])
+            for order_id in order_ids}
+
+def _patch_dashboard_data(data, fresh):
+    """Copy of a dashboard tuple with the given orders replaced, added or dropped"""
+    orders, services_by_order, last_change_by_order, progress_by_order, days_by_order = data
+    orders = [order for order in orders if order.id not in fresh]
+    services_by_order, last_change_by_order = dict(services_by_order), dict(last_change_by_order)
+    progress_by_order, days_by_order = dict(progress_by_order), dict(days_by_order)
+    
+    for order_id, (order, services, last_change, progress, days) in fresh.items():
+        for by_order in (services_by_order, last_change_by_order, progress_by_order, days_by_order):
+            by_order.pop(order_id, None)
+        if not order or order.archived:
+            continue
+        orders.append(order)
+        if services:
+            services_by_order[order_id] = services
+        if last_change:
+            last_change_by_order[order_id] = last_change
+        progress_by_order[order_id] = progress
+        days_by_order[order_id] = days
     
-    return days_by_order
+    # Already sorted apart from the patched orders, which timsort handles in linear time
+    orders.sort(key=order_sort_key, reverse=True)
+    return orders, services_by_order, last_change_by_order, progress_by_order, days_by_order
+
+def _project_dashboard_data(data, user_id):
+    """One user's dashboard tuple, sharing the records of the full one"""
+    orders, services_by_order, last_change_by_order, progress_by_order, days_by_order = data
+    orders = [order for order in orders if order.user_id == user_id]
+    order_ids = [order.id for order in orders]
+    return (orders,
+            {order_id: services_by_order[order_id] for order_id in order_ids if order_id in services_by_order},
+            {order_id: last_change_by_order[order_id] for order_id in order_ids if order_id in last_change_by_order},
+            {order_id: progress_by_order[order_id] for order_id in order_ids},
+            {order_id: days_by_order[order_id] for order_id in order_ids})
 
 # Streamlit app with optimizations
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_dashboard_data(user_id, is_admin):
     """Cached dashboard data to avoid repeated queries"""
-    orders = get_user_orders_optimized(user_id, is_admin)
-    if not orders:
-        return orders, {}, {}, {}, {}
-    
-    order_ids = [order['id'] for order in orders]
-    services_by_order = get_order_services_batch(order_ids)
-    changes_by_order = get_order_changes_batch(order_ids)
-    progress_by_order = calculate_order_progress_batch(order_ids, services_by_order)
-    days_by_order = get_days_since_last_change_batch(order_ids, changes_by_order)
+    return get_dashboard_engine().get((user_id, is_admin))
+
+def _build_dashboard_data(user_id, is_admin):
+    # One snapshot and a few set-based queries, however many orders are visible
+    scope = OrderScope(user_id, is_admin, False)
+    with read_snapshot():
+        orders = get_user_orders_optimized(user_id, is_admin)
+        if not orders:
+            return orders, {}, {}, {}, {}
+        
+        order_ids = [order.id for order in orders]
+        services_by_order = get_order_services_batch(order_ids, scope=scope)
+        last_change_by_order = get_last_change_batch(order_ids, scope=scope)
+        if DASHBOARD_PERSISTED_PROGRESS:
+            progress_by_order = {order.id: order.progress for order in orders}
+        else:
+            progress_by_order = get_order_progress_batch(order_ids, scope=scope)
+    days_by_order = get_days_since_last_change_batch(order_ids, last_change_by_order)
     
-    return orders, services_by_order, changes_by_order, progress_by_order, days_by_order
+    return orders, services_by_order, last_change_by_order, progress_by_order, days_by_order
 
 # Keep the rest of the helper functions with minor optimizations
+ALL_USERS_SQL = register_query('all_users', "SELECT id, username FROM users", allow_scan=True)
+ACTIVE_ORDERS_SQL = register_query('active_orders', "SELECT o.*, u.username FROM orders o JOIN users u ON o.user_id = u.id WHERE o.archived = 0")
+TEMPLATES_SQL = register_query('templates', "SELECT id, name, template_services FROM services WHERE is_template = ?")
+
 def get_all_users():
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            c.execute("SELECT id, username FROM users")
+            c.execute(ALL_USERS_SQL)
             users = c.fetchall()
             return [(row['id'], row['username']) for row in users]
     except Exception as e:
@@ -326,9 +1516,9 @@ def get_all_users():
 
 def get_all_active_orders():
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            c.execute("SELECT o.*, u.username FROM orders o JOIN users u ON o.user_id = u.id WHERE o.archived = 0")
+            c.execute(ACTIVE_ORDERS_SQL)
             orders = c.fetchall()
             return [dict(row) for row in orders]
     except Exception as e:
@@ -337,109 +1527,229 @@ def get_all_active_orders():
 
 def get_templates():
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             c = conn.cursor()
-            c.execute("SELECT id, name, template_services FROM services WHERE is_template = ?", (True,))
+            c.execute(TEMPLATES_SQL, (True,))
             templates = c.fetchall()
             return [(row['id'], row['name'], row['template_services']) for row in templates]
     except Exception as e:
         logger.error(f"Error in get_templates: {str(e)}")
         return []
 
-def log_change(order_id, user_id, description):
+# Write jobs run on the writer thread, each in its own transaction() scope; a business
+# operation and its changes audit row therefore land together or not at all
+def _insert_change(conn, order_id, user_id, description):
+    conn.execute("INSERT INTO changes (order_id, user_id, description, timestamp) VALUES (?, ?, ?, ?)",
+                 (order_id, user_id, description, now_ms()))
+
+def _create_order(conn, user_id, business_name, email, phone, address):
+    order_id = conn.execute("""INSERT INTO orders (uuid, user_id, business_name, email, phone, address, created_at, archived, progress)
+                               VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0)""",
+                            (new_uuid7(), user_id, business_name, email, phone, address, now_ms())).lastrowid
+    _insert_change(conn, order_id, user_id, "Order created")
+    return order_id
+
+def _set_password_hash(conn, user_id, old_hash, new_hash):
+    # Only replaces the hash that was verified, never a password changed in the meantime
+    conn.execute("UPDATE users SET password = ? WHERE id = ? AND password = ?", (new_hash, user_id, old_hash))
+
+def _create_session(conn, token_hash, user_id, created_at, expires_at):
+    conn.execute("INSERT INTO sessions (token_hash, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                 (token_hash, user_id, created_at, expires_at))
+    # Expired sessions are swept off the expiry index as new ones are made
+    conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (created_at,))
+
+def _renew_session(conn, token_hash, now, expires_at):
+    # Only a live session is renewed, and never moved earlier
+    rows = conn.execute("UPDATE sessions SET expires_at = MAX(expires_at, ?) WHERE token_hash = ? AND expires_at > ? "
+                        "RETURNING expires_at", (expires_at, token_hash, now)).fetchall()
+    if not rows:
+        raise LookupError("Session not found")
+    return rows[0][0]
+
+def _delete_session(conn, token_hash):
+    conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
+
+def _set_order_archived(conn, order_id, user_id, archived):
+    updated = conn.execute("UPDATE orders SET archived = ? WHERE id = ?", (1 if archived else 0, order_id))
+    if updated.rowcount == 0:
+        raise LookupError("Order not found")
+    _insert_change(conn, order_id, user_id, "Order archived" if archived else "Order restored")
+
+def _add_service(conn, order_id, user_id, service_id, template_id):
+    c = conn.cursor()
+    c.execute("SELECT name FROM services_list WHERE id = ?", (service_id,))
+    service_result = c.fetchone()
+    if not service_result:
+        raise LookupError("Service not found")
+    
+    service_name = service_result['name']
+    # Read inside the job's transaction rather than from the cache, which the
+    # writer thread cannot reach
+    first_stage = c.execute("SELECT id FROM stages ORDER BY position LIMIT 1").fetchone()
+    first_stage_id = first_stage['id'] if first_stage else None
+    
+    if template_id:
+        template_services = ""
+        c.execute("SELECT template_services FROM services WHERE id = ?", (template_id,))
+        template_result = c.fetchone()
+        if template_result:
+            template_services = template_result['template_services']
+        
+        c.execute("INSERT INTO services (uuid, order_id, name, stage_id, is_template, template_services) VALUES (?, ?, ?, ?, ?, ?)",
+                 (new_uuid7(), order_id, service_name, first_stage_id, True, template_services))
+    else:
+        c.execute("INSERT INTO services (uuid, order_id, name, stage_id, is_template) VALUES (?, ?, ?, ?, ?)",
+                 (new_uuid7(), order_id, service_name, first_stage_id, False))
+    
+    _refresh_order_progress(conn, order_id)
+    _insert_change(conn, order_id, user_id, f"Service {service_name} added")
+
+def _refresh_order_progress(conn, order_id=None):
+    """Recompute the persisted orders.progress column for one order, or all of them"""
+    if order_id is None:
+        conn.execute(f"UPDATE orders SET progress = {ORDER_PROGRESS_SQL.format(order_id='orders.id')}")
+    else:
+        conn.execute(f"UPDATE orders SET progress = {ORDER_PROGRESS_SQL.format(order_id='orders.id')} WHERE id = ?", (order_id,))
+
+def _set_service_stage(conn, service_id, user_id, stage_id):
+    c = conn.cursor()
+    c.execute("SELECT order_id, name FROM services WHERE id = ?", (service_id,))
+    service = c.fetchone()
+    if not service:
+        raise LookupError("Service not found")
+    c.execute("SELECT name FROM stages WHERE id = ?", (stage_id,))
+    stage = c.fetchone()
+    if not stage:
+        raise LookupError("Stage not found")
+    
+    c.execute("UPDATE services SET stage_id = ? WHERE id = ?", (stage_id, service_id))
+    _refresh_order_progress(conn, service['order_id'])
+    _insert_change(conn, service['order_id'], user_id, f"Service {service['name']} moved to {stage['name']}")
+
+# Mutations return the write Future; wait=False lets callers batch up writes and
+# only block on durability when they need it
+def log_change(order_id, user_id, description, wait=True):
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute("INSERT INTO changes (id, order_id, user_id, description, timestamp) VALUES (?, ?, ?, ?, ?)",
-                     (str(uuid.uuid4()), order_id, user_id, description, datetime.now().isoformat()))
-            conn.commit()
-            # Clear cache when data changes
-            get_dashboard_data.clear()
+        return submit_write(_insert_change, order_id, user_id, description, wait=wait)
     except Exception as e:
         logger.error(f"Error in log_change: {str(e)}")
 
-def archive_order(order_id, user_id):
+def create_order(user_id, business_name, email, phone, address, wait=True):
+    """Create an order; the Future resolves to its integer id"""
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute("UPDATE orders SET archived = 1 WHERE id = ?", (order_id,))
-            log_change(order_id, user_id, "Order archived")
-            conn.commit()
-            # Clear cache when data changes
-            get_dashboard_data.clear()
+        return submit_write(_create_order, user_id, business_name, email, phone, address, wait=wait)
+    except Exception as e:
+        logger.error(f"Error in create_order: {str(e)}")
+
+def archive_order(order_id, user_id, wait=True):
+    try:
+        return submit_write(_set_order_archived, order_id, user_id, True, wait=wait)
     except Exception as e:
         logger.error(f"Error in archive_order: {str(e)}")
 
-def restore_order(order_id, user_id):
+def restore_order(order_id, user_id, wait=True):
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute("UPDATE orders SET archived = 0 WHERE id = ?", (order_id,))
-            log_change(order_id, user_id, "Order restored")
-            conn.commit()
-            # Clear cache when data changes
-            get_dashboard_data.clear()
+        return submit_write(_set_order_archived, order_id, user_id, False, wait=wait)
     except Exception as e:
         logger.error(f"Error in restore_order: {str(e)}")
 
-def add_service_to_order(order_id, user_id, service_id, template_id=None):
+def archive_orders(order_ids, user_id, wait=True):
+    """Archive several orders in a single transaction"""
     try:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT name FROM services_list WHERE id = ?", (service_id,))
-            service_result = c.fetchone()
-            if not service_result:
-                st.error("Service not found")
-                return
-            
-            service_name = service_result['name']
-            stages = get_stages_cached()
-            first_stage = stages[0][1] if stages else "To Do"
-            
-            template_services = ""
-            if template_id:
-                c.execute("SELECT template_services FROM services WHERE id = ?", (template_id,))
-                template_result = c.fetchone()
-                if template_result:
-                    template_services = template_result['template_services']
-                
-                c.execute("INSERT INTO services (id, order_id, name, stage, is_template, template_services) VALUES (?, ?, ?, ?, ?, ?)",
-                         (str(uuid.uuid4()), order_id, service_name, first_stage, True, template_services))
-            else:
-                c.execute("INSERT INTO services (id, order_id, name, stage, is_template) VALUES (?, ?, ?, ?, ?)",
-                         (str(uuid.uuid4()), order_id, service_name, first_stage, False))
-            
-            log_change(order_id, user_id, f"Service {service_name} added")
-            conn.commit()
-            # Clear cache when data changes
-            get_dashboard_data.clear()
+        return submit_transaction([(_set_order_archived, order_id, user_id, True) for order_id in order_ids], wait=wait)
+    except Exception as e:
+        logger.error(f"Error in archive_orders: {str(e)}")
+
+def restore_orders(order_ids, user_id, wait=True):
+    """Restore several orders in a single transaction"""
+    try:
+        return submit_transaction([(_set_order_archived, order_id, user_id, False) for order_id in order_ids], wait=wait)
+    except Exception as e:
+        logger.error(f"Error in restore_orders: {str(e)}")
+
+def add_service_to_order(order_id, user_id, service_id, template_id=None, wait=True):
+    try:
+        return submit_write(_add_service, order_id, user_id, service_id, template_id, wait=wait)
+    except LookupError as e:
+        st.error(str(e))
     except Exception as e:
         logger.error(f"Error in add_service_to_order: {str(e)}")
 
-# Initialize app
-logger.info("Starting Streamlit app")
-st.set_page_config(page_title="Order Tracking App", layout="wide")
+def recompute_order_progress(wait=True):
+    """Rebuild every order's persisted progress, e.g. after the stages change"""
+    try:
+        engine = get_dashboard_engine()
+        future = submit_write(_refresh_order_progress, wait=wait)
+        # The recompute writes no changes rows, so the views are rebuilt instead of patched;
+        # the callback runs on the writer thread, so the engine is looked up here
+        future.add_done_callback(lambda f: engine.clear())
+        return future
+    except Exception as e:
+        logger.error(f"Error in recompute_order_progress: {str(e)}")
 
-# Initialize database
-logger.info("Initializing database")
-init_db()
+def update_service_stage(service_id, user_id, stage_id, wait=True):
+    try:
+        return submit_write(_set_service_stage, service_id, user_id, stage_id, wait=wait)
+    except LookupError as e:
+        st.error(str(e))
+    except Exception as e:
+        logger.error(f"Error in update_service_stage: {str(e)}")
 
-# Session state for authentication
-if 'user' not in st.session_state:
-    st.session_state.user = None
+# Process bootstrap: Streamlit re-executes this script on every interaction, so
+# everything that only needs doing once per server process lives here
+@st.cache_resource
+def bootstrap():
+    """Initialize the database, pools, writer thread and caches once per process"""
+    logger.info("Starting Streamlit app")
+    
+    # Initialize database
+    logger.info("Initializing database")
+    init_db()
+    get_write_queue()
+    get_ref_data_cache().get()
+    get_dashboard_engine()
+    get_auth_service()
+    try:
+        with get_db_connection(readonly=True) as conn:
+            check_query_plans(conn)
+    except Exception as e:
+        logger.error(f"Error checking query plans: {str(e)}")
+    return True
 
-# Optimized CSS injection (reduced size)
-st.markdown("""
+# Optimized CSS injection (reduced size); page output, so it is sent on every run
+PAGE_CSS = """
     <link href="https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css" rel="stylesheet">
     <style>
         .sidebar {background-color: #1E3A8A;}
         .card {transition: all 0.2s ease-in-out;}
         .card:hover {transform: translateY(-2px); box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);}
     </style>
-""", unsafe_allow_html=True)
+"""
+
+def main():
+    """Page logic for one script run"""
+    st.set_page_config(page_title="Order Tracking App", layout="wide")
+    bootstrap()
+    
+    # Session state for authentication
+    if 'user' not in st.session_state:
+        # A reconnect or restart resumes the session named in the URL without a password
+        st.session_state.user = restore_session()
+    
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+    
+    if not st.session_state.user:
+        render_login_page()
+    elif not renew_session():
+        # The session expired or was logged out in another tab
+        st.session_state.user = None
+        st.rerun()
+    else:
+        render_app()
 
 # Login page (unchanged for brevity, but could be optimized similarly)
-if not st.session_state.user:
+def render_login_page():
     st.markdown('<div class="flex justify-center items-center min-h-screen bg-gray-100"><div class="bg-white p-8 rounded-xl shadow-md w-full max-w-md">', unsafe_allow_html=True)
     st.markdown('<h1 class="text-2xl font-bold text-gray-800 mb-6 text-center">Login</h1>', unsafe_allow_html=True)
     
@@ -449,17 +1759,45 @@ if not st.session_state.user:
         login_button = st.form_submit_button("Login")
         
         if login_button:
-            user = check_login(username, password)
-            if user:
-                st.session_state.user = user
-                st.success("Logged in successfully!")
-                st.rerun()
+            try:
+                user = check_login(username, password)
+            except LoginRejected as e:
+                st.error(str(e))
             else:
-                st.error("Invalid username or password")
+                if user:
+                    st.session_state.user = user
+                    start_session(user)
+                    st.success("Logged in successfully!")
+                    st.rerun()
+                else:
+                    st.error("Invalid username or password")
     
     st.markdown('</div></div>', unsafe_allow_html=True)
 
-else:
+# The order overview grid: columns of plain values, with progress drawn as a bar
+ORDER_OVERVIEW_COLUMNS = {
+    'Order': st.column_config.TextColumn("Order"),
+    'Total Services': st.column_config.NumberColumn("Total Services"),
+    'Progress': st.column_config.ProgressColumn("Progress", min_value=0, max_value=100, format="%.2f%%"),
+}
+
+# The admin summary of active orders per owner, from DashboardMetrics.per_user
+USER_SUMMARY_COLUMNS = {
+    'User': st.column_config.TextColumn("User"),
+    'orders': st.column_config.NumberColumn("Orders"),
+    'avg_progress': st.column_config.ProgressColumn("Avg. Progress", min_value=0, max_value=100, format="%.2f%%"),
+    'avg_days': st.column_config.NumberColumn("Avg. Days Since Last Change", format="%.1f"),
+}
+
+def build_order_overview(page, services_by_order, progress_by_order):
+    """DataFrame of the order overview rows, one per order of the page"""
+    return pd.DataFrame({
+        'Order': [order.business_name for order in page],
+        'Total Services': [len(services_by_order.get(order.id, ())) for order in page],
+        'Progress': [progress_by_order.get(order.id, 0) for order in page],
+    }, index=pd.Index([order.id for order in page], name='order_id'))
+
+def render_app():
     user_id = st.session_state.user['id']
     username = st.session_state.user['username']
     is_admin = st.session_state.user['is_admin']
@@ -467,71 +1805,91 @@ else:
     # Navigation
     if 'page' not in st.session_state:
         st.session_state.page = 'dashboard'
+    
+    with st.sidebar:
+        st.caption(f"Signed in as {username}")
+        if st.button("Log out"):
+            end_session()
+            st.session_state.user = None
+            st.rerun()
 
     # Optimized Dashboard Page
     if st.session_state.page == 'dashboard':
         st.markdown('<h1 class="text-3xl font-bold text-gray-800 mb-6">Dashboard</h1>', unsafe_allow_html=True)
         
         # Use cached dashboard data
-        orders, services_by_order, changes_by_order, progress_by_order, days_by_order = get_dashboard_data(user_id, is_admin)
+        orders, services_by_order, _, progress_by_order, days_by_order = get_dashboard_data(user_id, is_admin)
+        include_archived = bool(is_admin) and st.checkbox("Include archived orders", key='include_archived')
+        metrics = get_dashboard_metrics(user_id, is_admin)
         
         if orders:
-            active_orders = len(orders)
-            days_values = [d for d in days_by_order.values() if d is not None]
-            avg_days = sum(days_values) / len(days_values) if days_values else 0
-            
-            st.markdown(f'<p class="text-gray-600 mb-6">Active Orders: {active_orders} | Avg. Days Since Last Change: {avg_days:.1f}</p>', unsafe_allow_html=True)
-            
-            # Order Overview with batch-processed data
+            # The header follows the live view; only the aggregates below may lag a write
+            days = [d for d in days_by_order.values() if d is not None]
+            avg_days = sum(days) / len(days) if days else 0
+            st.markdown(f'<p class="text-gray-600 mb-2">Active Orders: {len(orders)} | Avg. Days Since Last Change: {avg_days:.1f}</p>', unsafe_allow_html=True)
+        if orders and metrics:
+            stage_counts = ' | '.join(f"{name}: {metrics.orders_per_stage.get(stage_id, 0)}"
+                                      for stage_id, name, _ in get_stages_cached())
+            st.markdown(f'<p class="text-gray-600 mb-6">Orders per Stage: {stage_counts}</p>', unsafe_allow_html=True)
+        
+        # Keyset paging: the cursor stack holds the start of every page visited so far
+        if 'order_cursors' not in st.session_state or st.session_state.order_cursors_mode != include_archived:
+            st.session_state.order_cursors_mode = include_archived
+            st.session_state.order_cursors = [None]
+            st.session_state.order_prefetch = {}
+        cursor = st.session_state.order_cursors[-1]
+        
+        if include_archived:
+            # Archived history is not materialized, so page it straight from the database
+            prefetched = st.session_state.order_prefetch.pop(cursor, None)
+            page, next_cursor = prefetched.result() if prefetched else get_orders_page(user_id, is_admin, True, after=cursor)
+            page_ids = [order.id for order in page]
+            page_services = get_order_services_batch(page_ids)
+            page_progress = ({order.id: order.progress for order in page} if DASHBOARD_PERSISTED_PROGRESS
+                             else get_order_progress_batch(page_ids))
+            if next_cursor is not None:
+                st.session_state.order_prefetch = {next_cursor: get_prefetch_executor().submit(
+                    get_orders_page, user_id, is_admin, True, after=next_cursor, pool=get_read_pool())}
+        else:
+            page, next_cursor = page_orders(orders, after=cursor)
+            page_services, page_progress = services_by_order, progress_by_order
+        
+        if page:
+            # Order Overview with batch-processed data, sent to the browser as Arrow
             st.markdown('<h2 class="text-xl font-semibold text-gray-700 mb-4">Order Overview</h2>', unsafe_allow_html=True)
-            st.markdown('<div class="bg-white rounded-xl shadow-md overflow-x-auto mb-8 card">', unsafe_allow_html=True)
-            
-            # Build table HTML efficiently
-            table_rows = []
-            for order in orders:
-                order_id = order['id']
-                business_name = order['business_name']
-                services = services_by_order.get(order_id, [])
-                total_services = len(services)
-                progress = progress_by_order.get(order_id, 0)
-                
-                table_rows.append(f'''
-                    <tr>
-                        <td class="px-6 py-4 whitespace-nowrap">
-                            <div class="text-sm font-medium text-gray-900">{business_name}</div>
-                        </td>
-                        <td class="px-6 py-4 whitespace-nowrap">
-                            <div class="text-sm text-gray-500">{total_services}</div>
-                        </td>
-                        <td class="px-6 py-4 whitespace-nowrap">
-                            <div class="w-64 bg-gray-200 rounded-full h-2.5">
-                                <div class="bg-gradient-to-r from-blue-500 to-blue-600 h-2.5 rounded-full" style="width: {progress}%"></div>
-                            </div>
-                            <span class="ml-2 text-sm text-gray-500">{progress}%</span>
-                        </td>
-                    </tr>
-                ''')
+            st.dataframe(build_order_overview(page, page_services, page_progress), hide_index=True,
+                         use_container_width=True, column_config=ORDER_OVERVIEW_COLUMNS)
             
-            table_html = f'''
-                <table class="min-w-full divide-y divide-gray-200">
-                    <thead class="bg-gray-50">
-                        <tr>
-                            <th class="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Order</th>
-                            <th class="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Total Services</th>
-                            <th class="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Progress</th>
-                        </tr>
-                    </thead>
-                    <tbody class="bg-white divide-y divide-gray-200">
-                        {''.join(table_rows)}
-                    </tbody>
-                </table>
-            '''
-            
-            st.markdown(table_html, unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+            previous_col, page_col, next_col = st.columns([1, 4, 1])
+            with previous_col:
+                if st.button("Previous", disabled=len(st.session_state.order_cursors) == 1):
+                    st.session_state.order_cursors.pop()
+                    st.rerun()
+            with page_col:
+                st.caption(f"Page {len(st.session_state.order_cursors)}")
+            with next_col:
+                if st.button("Next", disabled=next_cursor is None):
+                    st.session_state.order_cursors.append(next_cursor)
+                    st.rerun()
+        
+        elif len(st.session_state.order_cursors) > 1:
+            # The orders past this cursor are gone; start over from the first page
+            st.session_state.order_cursors = [None]
+            st.rerun()
         
         else:
             st.markdown('<p class="text-gray-600">No orders found.</p>', unsafe_allow_html=True)
+        
+        if is_admin and metrics is not None and len(metrics.per_user):
+            # Active orders summarized per owner
+            st.markdown('<h2 class="text-xl font-semibold text-gray-700 mb-4">Orders per User</h2>', unsafe_allow_html=True)
+            per_user = metrics.per_user.rename(index=dict(get_all_users())).rename_axis('User').reset_index()
+            st.dataframe(per_user, hide_index=True, use_container_width=True, column_config=USER_SUMMARY_COLUMNS)
 
     # Add simplified versions of other pages here...
     # For brevity, I'm not including all pages, but they would follow similar optimization patterns
+
+# `streamlit run` executes this file as __main__; importing it (e.g. from a benchmark)
+# only defines the helpers
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Micro-benchmarks for the dashboard hot paths
+
+Run with `python benchmarks.py [service counts...]`, e.g. `python benchmarks.py 1000 100000`;
+the counts size the metrics benchmark, the overview benchmark uses one page of
+ORDERS_PAGE_SIZE orders, the shape the dashboard renders.
+Data is synthetic and held in memory, so only the computation itself is timed.
+"""
+import random
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import app
+
+STAGES = ((1, 'To Do', 1), (2, 'In Progress', 2), (3, 'Done', 3))
+SERVICES_PER_ORDER = 5
+USERS = 50
+
+def best_of(fn, repeat=3):
+    """Fastest of repeat runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def make_metrics_data(n_services, seed=0):
+    """orders and services frames shaped like load_metrics_frames() output"""
+    rng = random.Random(seed)
+    n_orders = max(1, n_services // SERVICES_PER_ORDER)
+    now = app.now_ms()
+    orders = pd.DataFrame({
+        'id': range(1, n_orders + 1),
+        'user_id': [f"user-{rng.randrange(USERS)}" for _ in range(n_orders)],
+        'last_change': [now - rng.randrange(60 * app.MS_PER_DAY) if rng.random() < 0.9 else None
+                        for _ in range(n_orders)],
+    })
+    stage_ids = [rng.choice(STAGES)[0] for _ in range(n_services)]
+    positions = {stage_id: position for stage_id, _, position in STAGES}
+    services = pd.DataFrame({
+        'order_id': [rng.randrange(1, n_orders + 1) for _ in range(n_services)],
+        'stage_id': stage_ids,
+        'position': [positions[stage_id] for stage_id in stage_ids],
+    })
+    return orders, services
+
+def legacy_inputs(orders, services):
+    """The same data in the per-order dict shapes the dashboard used to loop over"""
+    names = {stage_id: name for stage_id, name, _ in STAGES}
+    services_by_order = {}
+    for order_id, stage_id in zip(services['order_id'], services['stage_id']):
+        services_by_order.setdefault(order_id, []).append({'order_id': order_id, 'stage': names[stage_id]})
+    changes_by_order = {order_id: [{'timestamp': datetime.fromtimestamp(last_change / 1000).isoformat()}]
+                        for order_id, last_change in zip(orders['id'], orders['last_change']) if pd.notna(last_change)}
+    return list(orders['id']), services_by_order, changes_by_order
+
+def legacy_metrics(order_ids, services_by_order, changes_by_order):
+    # calculate_order_progress_batch, get_days_since_last_change_batch and the
+    # average-days loop as they were before the columnar engine
+    stage_positions = {name: position for _, name, position in STAGES}
+    total_stages = max(stage_positions.values()) if stage_positions else 1
+    progress_by_order = {}
+    for order_id in order_ids:
+        services = services_by_order.get(order_id, [])
+        if not services:
+            progress_by_order[order_id] = 0
+            continue
+        total_position = sum(stage_positions.get(service['stage'], 1) for service in services)
+        progress_by_order[order_id] = round(total_position / len(services) / total_stages * 100, 2)
+    days_by_order = {}
+    for order_id in order_ids:
+        changes = changes_by_order.get(order_id, [])
+        if changes:
+            days_by_order[order_id] = (datetime.now() - datetime.fromisoformat(changes[0]['timestamp'])).days
+        else:
+            days_by_order[order_id] = None
+    days_values = [d for d in days_by_order.values() if d is not None]
+    avg_days = sum(days_values) / len(days_values) if days_values else 0
+    return progress_by_order, days_by_order, avg_days
+
+def bench_metrics(sizes):
+    print(f"{'services':>10} {'orders':>8} {'loops (s)':>10} {'vectorized (s)':>15} {'speedup':>8}")
+    max_position = max(position for _, _, position in STAGES)
+    for n_services in sizes:
+        orders, services = make_metrics_data(n_services)
+        inputs = legacy_inputs(orders, services)
+        loops = best_of(lambda: legacy_metrics(*inputs))
+        vectorized = best_of(lambda: app.compute_dashboard_metrics(orders, services, max_position))
+        print(f"{n_services:>10} {len(orders):>8} {loops:>10.4f} {vectorized:>15.4f} {loops / vectorized:>7.1f}x")
+
+def make_overview_data(n_orders, seed=0):
+    """Order records, services and progress shaped like one dashboard view"""
+    rng = random.Random(seed)
+    orders = [app.OrderRecord(order_id, None, f"user-{rng.randrange(USERS)}", f"Business {order_id}", None, None, None,
+                              1_700_000_000_000 + order_id, 0, round(rng.random() * 100, 2))
+              for order_id in range(n_orders, 0, -1)]
+    services_by_order = {order.id: [None] * rng.randrange(1, 2 * SERVICES_PER_ORDER) for order in orders}
+    progress_by_order = {order.id: order.progress for order in orders}
+    return orders, services_by_order, progress_by_order
+
+def legacy_table_html(page, services_by_order, progress_by_order):
+    # The per-row f-string table the overview was rendered with before the grid
+    table_rows = []
+    for order in page:
+        progress = progress_by_order.get(order.id, 0)
+        table_rows.append(f'''
+            <tr>
+                <td class="px-6 py-4 whitespace-nowrap"><div class="text-sm font-medium text-gray-900">{order.business_name}</div></td>
+                <td class="px-6 py-4 whitespace-nowrap"><div class="text-sm text-gray-500">{len(services_by_order.get(order.id, []))}</div></td>
+                <td class="px-6 py-4 whitespace-nowrap">
+                    <div class="w-64 bg-gray-200 rounded-full h-2.5">
+                        <div class="bg-gradient-to-r from-blue-500 to-blue-600 h-2.5 rounded-full" style="width: {progress}%"></div>
+                    </div>
+                    <span class="ml-2 text-sm text-gray-500">{progress}%</span>
+                </td>
+            </tr>
+        ''')
+    return f"<table><tbody>{''.join(table_rows)}</tbody></table>"
+
+def bench_overview(n_orders=10_000):
+    """Rerun cost of the order overview when a single order has changed
+
+    Either way the whole table is rebuilt: the HTML rows were, and st.dataframe
+    sends the whole frame to the browser on every rerun, so there is nothing to
+    gain from keeping per-row fragments of unchanged orders.
+    """
+    orders, services_by_order, progress_by_order = make_overview_data(n_orders)
+
+    def one_modified(build):
+        changed = orders[len(orders) // 2]
+        progress_by_order[changed.id] = changed.progress = round(random.random() * 100, 2)
+        build(orders, services_by_order, progress_by_order)
+
+    html = best_of(lambda: one_modified(legacy_table_html))
+    frame = best_of(lambda: one_modified(app.build_order_overview))
+    print(f"{n_orders} orders, 1 modified")
+    print(f"  HTML rows:      {html * 1000:8.2f} ms")
+    print(f"  overview frame: {frame * 1000:8.2f} ms")
+
+if __name__ == "__main__":
+    bench_metrics([int(arg) for arg in sys.argv[1:]] or [1_000, 100_000, 1_000_000])
+    print()
+    bench_overview()
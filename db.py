@@ -0,0 +1,391 @@
+"""SQLite connection pools, transaction scopes and the state they share
+
+Streamlit executes app.py in a fresh module on every rerun, while the pools and the
+writer thread built by the first run live on for the whole process. Everything that
+has to be the same object on every run, like the thread-local connection bookkeeping,
+therefore lives in this module, which is imported once.
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Database settings, overridable through the environment
+DB_PATH = os.environ.get('ORDERS_DB_PATH', 'orders.db')
+DB_READ_POOL_SIZE = int(os.environ.get('ORDERS_DB_READ_POOL_SIZE', '8'))
+DB_POOL_CHECKOUT_TIMEOUT = float(os.environ.get('ORDERS_DB_POOL_CHECKOUT_TIMEOUT', '30'))
+DB_POOL_IDLE_TIMEOUT = float(os.environ.get('ORDERS_DB_POOL_IDLE_TIMEOUT', '300'))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get('ORDERS_DB_BUSY_TIMEOUT_MS', '5000'))
+DB_MMAP_SIZE = int(os.environ.get('ORDERS_DB_MMAP_SIZE', str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.environ.get('ORDERS_DB_CACHE_SIZE_KB', '16384'))
+DB_WRITE_BATCH_SIZE = int(os.environ.get('ORDERS_DB_WRITE_BATCH_SIZE', '128'))
+DB_WRITE_BATCH_WINDOW = float(os.environ.get('ORDERS_DB_WRITE_BATCH_WINDOW', '0.005'))
+
+# Thread-local storage for the connections and transaction depth of this thread. It
+# must be one object for the whole process: the writer thread started by the first
+# run sets it, and the write jobs submitted by later runs read it.
+thread_local = threading.local()
+
+class ConnectionPool:
+    """Bounded pool of tuned SQLite connections with idle-connection reaping
+
+    Read-only pools open `mode=ro` URI connections; WAL mode is set by the
+    writer, which owns the database file. idle_timeout=None disables reaping.
+    """
+
+    def __init__(self, path, max_size=DB_READ_POOL_SIZE, readonly=False, checkout_timeout=DB_POOL_CHECKOUT_TIMEOUT,
+                 idle_timeout=DB_POOL_IDLE_TIMEOUT, busy_timeout_ms=DB_BUSY_TIMEOUT_MS):
+        self.path = path
+        self.max_size = max_size
+        self.readonly = readonly
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.stats = {'created': 0, 'closed': 0, 'reaped': 0, 'checkouts': 0, 'returns': 0,
+                      'in_use': 0, 'waits': 0, 'timeouts': 0}
+        self._idle = []  # (connection, returned_at), most recently returned last
+        self._size = 0
+        self._available = threading.Condition(threading.Lock())
+        self._closed = threading.Event()
+        if idle_timeout is not None:
+            self._reaper = threading.Thread(target=self._reap_loop, name='db-pool-reaper', daemon=True)
+            self._reaper.start()
+
+    def _connect(self):
+        if self.readonly:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True,
+                                   timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        if self.readonly:
+            conn.execute("PRAGMA query_only = 1")
+        else:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+        return conn
+
+    def checkout(self):
+        """Take an idle connection, open a new one, or wait until one is returned"""
+        deadline = time.monotonic() + self.checkout_timeout
+        conn = None
+        with self._available:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise sqlite3.OperationalError(
+                        f"Timed out after {self.checkout_timeout}s waiting for a database connection")
+                self.stats['waits'] += 1
+                self._available.wait(remaining)
+            if self._idle:
+                conn, _ = self._idle.pop()
+            else:
+                self._size += 1
+            self.stats['checkouts'] += 1
+            self.stats['in_use'] += 1
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._available:
+                    self._size -= 1
+                    self.stats['in_use'] -= 1
+                    self._available.notify()
+                raise
+            with self._available:
+                self.stats['created'] += 1
+        return conn
+
+    def checkin(self, conn):
+        """Return a connection to the pool, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.error(f"Discarding broken pooled connection: {str(e)}")
+            self._discard(conn)
+            return
+
+        with self._available:
+            self.stats['returns'] += 1
+            self.stats['in_use'] -= 1
+            if self._closed.is_set():
+                self._size -= 1
+                self.stats['closed'] += 1
+                conn.close()
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._available.notify()
+
+    def _discard(self, conn):
+        with self._available:
+            self.stats['returns'] += 1
+            self.stats['in_use'] -= 1
+            self.stats['closed'] += 1
+            self._size -= 1
+            self._available.notify()
+        conn.close()
+
+    def reap_idle(self):
+        """Close connections that have sat idle longer than idle_timeout"""
+        if self.idle_timeout is None:
+            return 0
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._available:
+            stale = [conn for conn, returned_at in self._idle if returned_at < cutoff]
+            self._idle = [(conn, returned_at) for conn, returned_at in self._idle if returned_at >= cutoff]
+            self._size -= len(stale)
+            self.stats['reaped'] += len(stale)
+            self.stats['closed'] += len(stale)
+        for conn in stale:
+            conn.close()
+        return len(stale)
+
+    def _reap_loop(self):
+        interval = max(self.idle_timeout / 2, 1)
+        while not self._closed.wait(interval):
+            self.reap_idle()
+
+    def close(self):
+        """Close idle connections now and checked-out ones as they are returned"""
+        self._closed.set()
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self.stats['closed'] += len(idle)
+        for conn, _ in idle:
+            conn.close()
+
+    def status(self):
+        with self._available:
+            return dict(self.stats, size=self._size, idle=len(self._idle), max_size=self.max_size)
+
+@st.cache_resource
+def get_read_pool():
+    """Process-wide pool of read-only connections shared by every session and rerun"""
+    return ConnectionPool(DB_PATH, readonly=True)
+
+@st.cache_resource
+def get_write_pool():
+    """Single writer connection; checking it out serializes all writes in the process.
+
+    It is never reaped so the WAL and shared-memory files stay in place for readers.
+    """
+    return ConnectionPool(DB_PATH, max_size=1, idle_timeout=None)
+
+@contextmanager
+def get_db_connection(readonly=False, pool=None):
+    """Context manager that routes reads to the read-only pool and writes to the writer
+
+    Background threads have no script context to resolve the cached pools from,
+    so work handed to them passes the pool it should check out from.
+    """
+    # Nested helpers (e.g. log_change inside archive_order) reuse the outer connection,
+    # and reads inside a write see that write's uncommitted rows
+    conn = getattr(thread_local, 'write_connection', None)
+    if conn is None and readonly:
+        conn = getattr(thread_local, 'read_connection', None)
+    if conn is not None:
+        pool = None
+    else:
+        pool = pool or (get_read_pool() if readonly else get_write_pool())
+        conn = pool.checkout()
+        setattr(thread_local, 'read_connection' if readonly else 'write_connection', conn)
+    
+    try:
+        yield conn
+    except Exception as e:
+        # A borrowed connection belongs to an enclosing scope, which rolls back
+        # its own transaction or savepoint
+        if pool is not None:
+            conn.rollback()
+            logger.error(f"Database error: {str(e)}")
+        raise
+    finally:
+        if pool is not None:
+            setattr(thread_local, 'read_connection' if readonly else 'write_connection', None)
+            pool.checkin(conn)
+
+@contextmanager
+def read_snapshot():
+    """Read-only connection held in one transaction, so nested helpers see a consistent snapshot"""
+    with get_db_connection(readonly=True) as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+@contextmanager
+def transaction(conn):
+    """Transaction scope on the writer connection; nested scopes become savepoints
+
+    The outermost scope opens BEGIN IMMEDIATE and commits exactly once on exit.
+    An inner scope that raises is rolled back to its savepoint, leaving the
+    enclosing scope's work intact.
+    """
+    depth = getattr(thread_local, 'transaction_depth', 0)
+    savepoint = f"tx_{depth}"
+    conn.execute("BEGIN IMMEDIATE" if depth == 0 else f"SAVEPOINT {savepoint}")
+    thread_local.transaction_depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        if depth == 0:
+            conn.rollback()
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        raise
+    else:
+        if depth == 0:
+            conn.commit()
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+    finally:
+        thread_local.transaction_depth = depth
+
+class ChangeBus:
+    """In-process signal that a write group has committed
+
+    Subscribers are called without arguments; what changed is read back from the
+    database, e.g. from the changes feed.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def publish(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in change subscriber: {str(e)}")
+
+@st.cache_resource
+def get_change_bus():
+    """Process-wide change bus shared by the writer thread and the caches"""
+    return ChangeBus()
+
+class WriteQueue:
+    """One background writer thread that applies queued mutations with group commit
+
+    A job is a callable taking the writer connection plus its arguments. It must not
+    commit; it runs in a nested transaction() scope, so a failing job is rolled back
+    without losing the rest of its group. The thread commits once per group, when
+    batch_size jobs are collected or batch_window seconds pass, then signals the
+    change bus if any job succeeded and resolves the futures.
+    The pool and bus are passed in because the thread has no script context to
+    resolve cached resources from.
+    """
+
+    def __init__(self, pool, bus, batch_size=DB_WRITE_BATCH_SIZE, batch_window=DB_WRITE_BATCH_WINDOW):
+        self.pool = pool
+        self.bus = bus
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.stats = {'jobs': 0, 'failed': 0, 'commits': 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue a job and return a Future that resolves with its result once committed"""
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._apply(batch)
+            except Exception as e:
+                logger.error(f"Error committing write batch: {str(e)}")
+                for future, _, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _apply(self, batch):
+        done = []
+        conn = self.pool.checkout()
+        # Jobs reach the connection through get_db_connection(), which reuses it
+        thread_local.write_connection = conn
+        try:
+            with transaction(conn):
+                for future, fn, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction(conn):
+                            result = fn(conn, *args, **kwargs)
+                    except Exception as e:
+                        self.stats['failed'] += 1
+                        future.set_exception(e)
+                    else:
+                        done.append((future, result))
+        finally:
+            thread_local.write_connection = None
+            self.pool.checkin(conn)
+        self.stats['jobs'] += len(batch)
+        self.stats['commits'] += 1
+        if done:
+            self.bus.publish()
+        for future, result in done:
+            future.set_result(result)
+
+@st.cache_resource
+def get_write_queue():
+    """Process-wide writer thread shared by every session"""
+    return WriteQueue(get_write_pool(), get_change_bus())
+
+def submit_write(fn, *args, wait=True):
+    """Queue a mutation on the writer thread, optionally blocking until it commits"""
+    future = get_write_queue().submit(fn, *args)
+    if wait:
+        future.result()
+    return future
+
+def _run_steps(conn, steps):
+    return [fn(conn, *args) for fn, *args in steps]
+
+def submit_transaction(steps, wait=True):
+    """Queue several write jobs as one atomic unit: all of them commit or none do
+
+    steps is a list of (job, *args) tuples; the Future resolves to their results.
+    """
+    return submit_write(_run_steps, steps, wait=wait)
@@ -0,0 +1,118 @@
+"""Streamlit executes app.py in a fresh module on every rerun, while the resources
+cached by the first run (pools, writer thread, auth service) live on. These tests
+drive the app through AppTest across several runs to catch state that does not
+survive that.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, 'app.py')
+DB_DIR = tempfile.mkdtemp(prefix='orders-test-')
+DB_PATH = os.path.join(DB_DIR, 'orders.db')
+
+# Settings are read when the app is first imported, so they are pinned up front
+os.environ['ORDERS_DB_PATH'] = DB_PATH
+os.environ['ORDERS_AUTH_HASH_ROUNDS'] = '4'
+os.environ['ORDERS_SESSION_TTL'] = '3'
+sys.path.insert(0, REPO_DIR)
+
+# One script run: app.py is executed in a fresh namespace, as a rerun does, and then
+# the helper named in session state is called with its arguments
+CALL_SCRIPT = """
+import streamlit as st
+namespace = {'__name__': 'order_tracking_app'}
+with open(APP_PATH) as f:
+    exec(compile(f.read(), APP_PATH, 'exec'), namespace)
+namespace['bootstrap']()
+if 'call' in st.session_state:
+    name, args = st.session_state.pop('call')
+    st.session_state.result = namespace[name](*args)
+"""
+
+def call_app(at, name, *args):
+    at.session_state['call'] = (name, args)
+    at.run()
+    assert not at.exception
+    return at.session_state['result']
+
+def query(sql, *params):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+@pytest.fixture
+def app_runner():
+    at = AppTest.from_string(CALL_SCRIPT.replace('APP_PATH', repr(APP_PATH)), default_timeout=60)
+    at.run()
+    assert not at.exception
+    return at
+
+def test_writes_from_a_later_run(app_runner):
+    user_id = query("SELECT id FROM users WHERE username = 'chadillac'")[0][0]
+    call_app(app_runner, 'create_order', user_id, 'Rerun Biz', 'a@example.com', '555', 'Main St')
+    (order_id,), = query("SELECT id FROM orders WHERE business_name = 'Rerun Biz'")
+
+    call_app(app_runner, 'archive_order', order_id, user_id)
+    assert query("SELECT archived FROM orders WHERE id = ?", order_id) == [(1,)]
+    assert query("SELECT description FROM changes WHERE order_id = ? ORDER BY rowid", order_id) == [
+        ('Order created',), ('Order archived',)]
+
+def test_login_rejection_from_a_later_run():
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    for _ in range(int(os.environ.get('ORDERS_AUTH_MAX_FAILURES_PER_USER', '5')) + 1):
+        at.text_input[0].input('intruder')
+        at.text_input[1].input('wrong password')
+        at.button[0].click().run()
+    assert not at.exception
+    assert at.error[0].value == "Too many failed login attempts. Please try again later."
+
+def log_in(username, password):
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    at.text_input[0].input(username)
+    at.text_input[1].input(password)
+    at.button[0].click().run()
+    assert not at.exception
+    return at
+
+def open_url(token):
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.query_params['session'] = token
+    return at.run()
+
+def test_session_renewed_while_in_use():
+    at = log_in('chadillac', 'roostersgrin')
+    token = at.query_params['session']
+    ttl = float(os.environ['ORDERS_SESSION_TTL'])
+    started = time.monotonic()
+    while time.monotonic() - started < ttl * 1.5:
+        time.sleep(0.5)
+        at.run()
+        assert at.session_state['user']['username'] == 'chadillac'
+
+    restored = open_url(token)
+    assert restored.session_state['user']['username'] == 'chadillac'
+    assert restored.query_params['session'] == token
+
+def test_session_shared_by_tabs_until_logout():
+    first = log_in('chadillac', 'roostersgrin')
+    token = first.query_params['session']
+    second = open_url(token)
+    assert second.session_state['user']['username'] == 'chadillac'
+    first.run()
+    assert first.session_state['user']['username'] == 'chadillac'
+
+    second.sidebar.button[0].click().run()
+    assert second.session_state['user'] is None
+    first.run()
+    assert first.session_state['user'] is None
+    assert 'session' not in first.query_params
+    assert open_url(token).session_state['user'] is None